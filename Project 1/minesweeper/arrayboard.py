@@ -0,0 +1,107 @@
+import numpy as np
+
+from minesweeper import Minesweeper
+
+
+class ArrayMinesweeper(Minesweeper):
+    """
+    Minesweeper game representation backed by NumPy arrays, for boards
+    too large for the list-of-lists representation.
+
+    `board` is a boolean array of mines and `counts` holds the number of
+    nearby mines of every cell, computed once when the board is created.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+        self.mine_count = mines
+
+        # Add mines at cells sampled without replacement
+        rng = np.random.default_rng(seed)
+        self.board = np.zeros((height, width), dtype=bool)
+        place_mines(rng, self.board, mines)
+
+        self.counts = neighbor_counts(self.board)
+
+        # At first, player has found no mines
+        self.mines_found = set()
+
+    @property
+    def mines(self):
+        """
+        Set of (i, j) cells containing mines. Built on every access, so
+        avoid it on very large boards.
+        """
+        return set(zip(*(index.tolist() for index in np.nonzero(self.board))))
+
+    def is_mine(self, cell):
+        return bool(self.board[cell])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        return int(self.counts[cell])
+
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        """
+        return (
+            len(self.mines_found) == self.mine_count
+            and all(self.board[cell] for cell in self.mines_found)
+        )
+
+
+def place_mines(rng, board, k):
+    """
+    Sets `k` cells of the all-False boolean array `board`, chosen
+    uniformly without replacement. Random cells are set in batches until
+    at least `k` are set, then a random selection of the surplus is
+    cleared. Unlike shuffling every cell index, this only needs index
+    arrays as large as the number of mines.
+    """
+    flat = board.reshape(-1)
+    if k > len(flat):
+        raise ValueError("more mines than cells")
+
+    placed = 0
+    while placed < k:
+        missing = k - placed
+        flat[rng.integers(0, len(flat), size=missing + missing // 8 + 16)] = True
+        placed = np.count_nonzero(flat)
+
+    if placed > k:
+        surplus = rng.choice(np.flatnonzero(flat), size=placed - k, replace=False)
+        flat[surplus] = False
+
+
+def neighbor_counts(board):
+    """
+    Returns an array with, for each cell of a boolean `board`, the number
+    of True cells within one row and column of it, not including itself.
+    The eight shifted copies of the board are added in place.
+    """
+    counts = np.zeros(board.shape, dtype=np.uint8)
+    height, width = board.shape
+
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            if di == 0 and dj == 0:
+                continue
+            target = counts[
+                max(di, 0):height + min(di, 0),
+                max(dj, 0):width + min(dj, 0)
+            ]
+            source = board[
+                max(-di, 0):height + min(-di, 0),
+                max(-dj, 0):width + min(-dj, 0)
+            ]
+            np.add(target, source, out=target, casting="unsafe")
+
+    return counts
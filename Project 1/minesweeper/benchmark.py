@@ -0,0 +1,199 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from bitboard import BitMinesweeper, BitMinesweeperAI
+from minesweeper import Minesweeper, MinesweeperAI
+from simulate import play_game
+
+# Expert board size
+HEIGHT = 16
+WIDTH = 30
+MINES = 99
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [1, 2, 3] or (
+            len(sys.argv) > 1 and sys.argv[1] not in BENCHMARKS):
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [n]")
+    name = sys.argv[1] if len(sys.argv) > 1 else "games"
+    benchmark, default = BENCHMARKS[name]
+    benchmark(int(sys.argv[2]) if len(sys.argv) == 3 else default)
+
+
+def benchmark_games(games):
+    """
+    Plays `games` expert-size games and prints the total game time
+    and the size of the knowledge base at the end of each game.
+    """
+    total = 0
+    moves = 0
+    sentences = 0
+
+    for seed in range(games):
+        result = play_game(HEIGHT, WIDTH, MINES, seed)
+        total += sum(result["times"])
+        moves += result["moves"]
+        sentences += result["knowledge"][-1] if result["knowledge"] else 0
+
+    print(f"Expert games ({HEIGHT}x{WIDTH}, {MINES} mines): {games}")
+    print(f"  Total game time: {total:.3f}s")
+    print(f"  Time per game: {1000 * total / games:.2f}ms")
+    print(f"  Time per move: {1000 * total / max(moves, 1):.3f}ms")
+    print(f"  Sentences at end of game: {sentences / games:.1f}")
+
+
+def benchmark_bitboard(size):
+    """
+    Compares the set-of-tuples and bitmask representations on a
+    `size` x `size` board with 15% mines: computing every cell's count of
+    nearby mines, and feeding the AI every safe cell in a random order.
+    """
+    mines = size * size * 15 // 100
+    cells = [(i, j) for i in range(size) for j in range(size)]
+
+    random.seed(0)
+    game = Minesweeper(height=size, width=size, mines=mines)
+    reveals = [cell for cell in cells if not game.is_mine(cell)]
+    random.shuffle(reveals)
+
+    bit_game = BitMinesweeper(height=size, width=size, mines=0)
+    for cell in game.mines:
+        bit_game.mines[bit_game.index(cell)] = 1
+    bit_reveals = [bit_game.index(cell) for cell in reveals]
+
+    print(f"Board: {size}x{size}, {mines} mines")
+
+    sets = timed(lambda: [game.nearby_mines(cell) for cell in cells])
+    masks = timed(lambda: [
+        bit_game.nearby_mines(cell) for cell in range(size * size)
+    ])
+    report("nearby_mines, every cell", sets, masks)
+
+    ai = SubsetAI(height=size, width=size)
+    sets = timed(lambda: [
+        ai.add_knowledge(cell, game.nearby_mines(cell)) for cell in reveals
+    ])
+    bit_ai = BitMinesweeperAI(height=size, width=size)
+    masks = timed(lambda: [
+        bit_ai.add_knowledge(cell, bit_game.nearby_mines(cell))
+        for cell in bit_reveals
+    ])
+    report("add_knowledge, every safe cell", sets, masks)
+
+    same = (
+        {bit_game.index(cell) for cell in ai.mines}
+        == {cell for cell in range(size * size) if bit_ai.mines[cell]}
+        and {bit_game.index(cell) for cell in ai.safes}
+        == {cell for cell in range(size * size) if bit_ai.safes[cell]}
+    )
+    print(f"  {'same' if same else 'different'} mines and safes found")
+
+
+def benchmark_random_moves(size):
+    """
+    Times random move selection late in a game on a `size` x `size` board
+    with 15% mines, once the AI has been told about 80% of the safe cells.
+    Compares the strategies of MinesweeperAI.make_random_move with drawing
+    random cells until one has not been played, as the AI used to do.
+    """
+    calls = 10000
+    mines = size * size * 15 // 100
+
+    random.seed(0)
+    game = Minesweeper(height=size, width=size, mines=mines)
+    reveals = [
+        (i, j) for i in range(size) for j in range(size)
+        if not game.is_mine((i, j))
+    ]
+    random.shuffle(reveals)
+
+    ai = SubsetAI(height=size, width=size, mines=mines)
+    for cell in reveals[:len(reveals) * 80 // 100]:
+        ai.add_knowledge(cell, game.nearby_mines(cell))
+    MinesweeperAI.solve(ai)
+
+    print(f"Board: {size}x{size}, {mines} mines, "
+          f"{len(ai.candidates)} candidate cells, "
+          f"{len(ai.probabilities)} with a mine probability")
+
+    def rejection_move():
+        while True:
+            move = (random.randrange(size), random.randrange(size))
+            if move not in ai.moves_made and move not in ai.mines:
+                return move
+
+    elapsed = timed(lambda: [rejection_move() for _ in range(calls)])
+    print(f"  rejection: {1e6 * elapsed / calls:.2f}us per move")
+
+    for strategy in ["uniform", "weighted", "safest"]:
+        ai.strategy = strategy
+        elapsed = timed(lambda: [ai.make_random_move() for _ in range(calls)])
+        print(f"  {strategy}: {1e6 * elapsed / calls:.2f}us per move")
+
+
+def benchmark_generation(size):
+    """
+    Times board generation and measures peak memory for square boards
+    with 15% mines, from 10x10 up to `size` x `size`, for Minesweeper
+    (up to 1000x1000) and ArrayMinesweeper.
+    """
+    from arrayboard import ArrayMinesweeper
+
+    sizes = [10]
+    while sizes[-1] * 10 <= size:
+        sizes.append(sizes[-1] * 10)
+
+    for side in sizes:
+        mines = side * side * 15 // 100
+        print(f"Board: {side}x{side}, {mines} mines")
+
+        boards = [("arrays", ArrayMinesweeper)]
+        if side <= 1000:
+            boards.insert(0, ("lists", Minesweeper))
+
+        for name, board in boards:
+            tracemalloc.start()
+            elapsed = timed(lambda: board(side, side, mines))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {name}: {elapsed:.3f}s, peak {peak / 2 ** 20:.1f}MiB")
+
+
+class SubsetAI(MinesweeperAI):
+    """
+    MinesweeperAI restricted to subset inference, so that it draws the
+    same conclusions as BitMinesweeperAI.
+    """
+
+    def solve(self):
+        pass
+
+
+def timed(function):
+    """
+    Returns the time taken to call `function`.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def report(name, sets, masks):
+    print(f"  {name}: sets {1000 * sets:.1f}ms, "
+          f"bitmasks {1000 * masks:.1f}ms ({sets / masks:.1f}x)")
+
+
+BENCHMARKS = {
+    "games": (benchmark_games, 100),
+    "bitboard": (benchmark_bitboard, 100),
+    "random": (benchmark_random_moves, 100),
+    "generation": (benchmark_generation, 10000)
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+import collections
+import random
+
+from minesweeper import CellPool
+
+# Bits per row of a sentence mask: a sentence covers at most three rows
+# and columns, and two sentences sharing a cell fit in five of each
+STRIDE = 8
+
+# Masks of the first row and of the first column of a sentence mask
+FIRST_ROW = (1 << STRIDE) - 1
+FIRST_COLUMN = sum(1 << (r * STRIDE) for r in range(STRIDE))
+
+
+class BitMinesweeper():
+    """
+    Minesweeper game representation where cells are integer indices
+    (i * width + j) and the mines are flags in a byte array.
+    """
+
+    def __init__(self, height=8, width=8, mines=8):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+        self.kinds, self.offsets = neighbor_offsets(height, width)
+
+        # Add mines randomly
+        self.mines = bytearray(height * width)
+        for cell in random.sample(range(height * width), mines):
+            self.mines[cell] = 1
+
+        # At first, player has found no mines
+        self.mines_found = bytearray(height * width)
+
+    def index(self, cell):
+        """
+        Returns the integer index of cell (i, j).
+        """
+        return cell[0] * self.width + cell[1]
+
+    def cell(self, index):
+        """
+        Returns the cell (i, j) of an integer index.
+        """
+        return divmod(index, self.width)
+
+    def is_mine(self, cell):
+        return self.mines[cell] == 1
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        mines = self.mines
+        return sum([
+            mines[cell + offset] for offset, _ in self.offsets[self.kinds[cell]]
+        ])
+
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        """
+        return self.mines_found == self.mines
+
+
+class BitSentence():
+    """
+    Logical statement about a Minesweeper game, where the set of board
+    cells is a bitmask over a window of the board: bit r * STRIDE + c of
+    the mask stands for cell (row + r, col + c).
+    """
+
+    def __init__(self, row, col, cells, count):
+        self.row = row
+        self.col = col
+        self.cells = cells
+        self.count = count
+
+    def __eq__(self, other):
+        return self.key() == other.key() and self.count == other.count
+
+    def __str__(self):
+        return f"({self.row}, {self.col}) {bin(self.cells)} = {self.count}"
+
+    def key(self):
+        """
+        Returns the (row, col, cells) window and mask of the sentence.
+        """
+        return self.row, self.col, self.cells
+
+    def known_mines(self):
+        """
+        Returns the mask of all cells in self.cells known to be mines.
+        """
+        if(self.cells.bit_count() == self.count):
+            return self.cells
+        return 0
+
+    def known_safes(self):
+        """
+        Returns the mask of all cells in self.cells known to be safe.
+        """
+        if(self.count == 0):
+            return self.cells
+        return 0
+
+    def mark_mine(self, i, j):
+        """
+        Updates internal knowledge representation given the fact that
+        cell (i, j) is known to be a mine.
+        """
+        bit = 1 << ((i - self.row) * STRIDE + j - self.col)
+        if(self.cells & bit):
+            self.cells ^= bit
+            self.count -= 1
+
+    def mark_safe(self, i, j):
+        """
+        Updates internal knowledge representation given the fact that
+        cell (i, j) is known to be safe.
+        """
+        self.cells &= ~(1 << ((i - self.row) * STRIDE + j - self.col))
+
+    def normalize(self):
+        """
+        Moves the window to the first row and column holding a cell.
+        """
+        self.row, self.col, self.cells = normalize(
+            self.row, self.col, self.cells
+        )
+
+    def issubset(self, other):
+        """
+        Returns True if every cell of this sentence is in `other`, a
+        sentence sharing a cell with it.
+        """
+        _, _, cells, other_cells = align(self, other)
+        return cells & ~other_cells == 0
+
+    def difference(self, other):
+        """
+        Returns the (row, col, cells) window and mask of the cells of this
+        sentence that are not in `other`, a sentence sharing a cell with it.
+        """
+        row, col, cells, other_cells = align(self, other)
+        return row, col, cells & ~other_cells
+
+
+class BitMinesweeperAI():
+    """
+    Minesweeper game player using integer cells and bitmask sentences.
+    Draws the same conclusions as MinesweeperAI's subset inference, without
+    the exact frontier solver.
+    """
+
+    def __init__(self, height=8, width=8):
+
+        # Set initial height and width
+        self.height = height
+        self.width = width
+        self.kinds, self.offsets = neighbor_offsets(height, width)
+
+        # Flags of cells clicked on, and known to be safe or mines
+        self.moves_made = bytearray(height * width)
+        self.mines = bytearray(height * width)
+        self.safes = bytearray(height * width)
+
+        # Cells known to be safe that have not been played
+        self.safe_moves = set()
+
+        # Cells neither played nor known to be mines
+        self.candidates = CellPool(range(height * width))
+
+        # Sentences known to be true, keyed by their window and cell mask
+        self.knowledge = dict()
+
+        # Keys of the sentences mentioning each cell
+        self.index = collections.defaultdict(set)
+
+        # Keys of sentences changed since last used for inference
+        self.pending = collections.deque()
+
+        # Index offsets of the cells of each mask seen, from its window
+        self.layouts = dict()
+
+    def mark_mine(self, cell):
+        """
+        Marks a cell as a mine, and updates all knowledge
+        to mark that cell as a mine as well.
+        """
+        if(self.mines[cell]):
+            return
+
+        self.mines[cell] = 1
+        self.candidates.discard(cell)
+        i, j = divmod(cell, self.width)
+        for key in self.index.pop(cell, set()):
+            self.update_sentence(key, lambda s: s.mark_mine(i, j))
+
+    def mark_safe(self, cell):
+        """
+        Marks a cell as safe, and updates all knowledge
+        to mark that cell as safe as well.
+        """
+        if(self.safes[cell]):
+            return
+
+        self.safes[cell] = 1
+        if(not self.moves_made[cell]):
+            self.safe_moves.add(cell)
+        i, j = divmod(cell, self.width)
+        for key in self.index.pop(cell, set()):
+            self.update_sentence(key, lambda s: s.mark_safe(i, j))
+
+    def add_sentence(self, row, col, cells, count):
+        """
+        Adds the sentence `cells` = `count`, a mask over the window at
+        (`row`, `col`), to the knowledge base, after removing cells already
+        known to be safe or mines. Empty and duplicate sentences are not
+        added.
+        """
+        for bit, cell in zip(bits(cells), self.cells(row, col, cells)):
+            if(self.safes[cell]):
+                cells ^= 1 << bit
+            elif(self.mines[cell]):
+                cells ^= 1 << bit
+                count -= 1
+
+        if(cells == 0):
+            return
+
+        key = normalize(row, col, cells)
+        if(key in self.knowledge):
+            return
+
+        self.knowledge[key] = BitSentence(*key, count)
+        for cell in self.cells(*key):
+            self.index[cell].add(key)
+        self.pending.append(key)
+
+    def remove_sentence(self, key):
+        """
+        Removes a sentence and its index entries from the knowledge base.
+        """
+        del self.knowledge[key]
+        for cell in self.cells(*key):
+            self.index[cell].discard(key)
+
+    def update_sentence(self, key, change):
+        """
+        Applies `change` to a sentence whose index entry for the changed
+        cell has already been removed, and re-keys it under its new window
+        and mask.
+        """
+        sentence = self.knowledge.pop(key)
+        change(sentence)
+
+        for cell in self.cells(*sentence.key()):
+            self.index[cell].discard(key)
+
+        if(sentence.cells == 0):
+            return
+        sentence.normalize()
+        key = sentence.key()
+        if(key in self.knowledge):
+            return
+
+        self.knowledge[key] = sentence
+        for cell in self.cells(*key):
+            self.index[cell].add(key)
+        self.pending.append(key)
+
+    def infer(self):
+        """
+        Draws conclusions from the queued sentences until no sentence is
+        left to process, as MinesweeperAI.infer does.
+        """
+        while len(self.pending) > 0:
+            key = self.pending.popleft()
+            if(key not in self.knowledge):
+                continue
+
+            sentence = self.knowledge[key]
+
+            known = sentence.known_safes()
+            if(known):
+                for cell in self.cells(sentence.row, sentence.col, known):
+                    self.mark_safe(cell)
+                continue
+
+            known = sentence.known_mines()
+            if(known):
+                for cell in self.cells(sentence.row, sentence.col, known):
+                    self.mark_mine(cell)
+                continue
+
+            related = set()
+            for cell in self.cells(*key):
+                related.update(self.index[cell])
+            related.discard(key)
+
+            for other_key in related:
+                other = self.knowledge[other_key]
+
+                if(sentence.issubset(other)):
+                    self.remove_sentence(other_key)
+                    self.add_sentence(
+                        *other.difference(sentence),
+                        other.count - sentence.count
+                    )
+
+                elif(other.issubset(sentence)):
+                    self.remove_sentence(key)
+                    self.add_sentence(
+                        *sentence.difference(other),
+                        sentence.count - other.count
+                    )
+                    break
+
+    def add_knowledge(self, cell, count):
+        """
+        Called when the Minesweeper board tells us, for a given
+        safe cell, how many neighboring cells have mines in them.
+        """
+        self.moves_made[cell] = 1
+        self.safe_moves.discard(cell)
+        self.candidates.discard(cell)
+        self.mark_safe(cell)
+        self.add_sentence(*self.neighbors(cell), count)
+        self.infer()
+
+    def neighbors(self, cell):
+        """
+        Returns the (row, col, cells) window and mask of the neighbors of
+        a cell that have not been played, the window starting one row and
+        column before the cell.
+        """
+        i, j = divmod(cell, self.width)
+        mask = 0
+        for offset, bit in self.offsets[self.kinds[cell]]:
+            if(not self.moves_made[cell + offset]):
+                mask |= bit
+        return i - 1, j - 1, mask
+
+    def cells(self, row, col, mask):
+        """
+        Returns the list of indices of the cells of `mask`, a mask over the
+        window at (`row`, `col`).
+        """
+        offsets = self.layouts.get(mask)
+        if(offsets is None):
+            offsets = [
+                bit // STRIDE * self.width + bit % STRIDE for bit in bits(mask)
+            ]
+            self.layouts[mask] = offsets
+        base = row * self.width + col
+        return [base + offset for offset in offsets]
+
+    def make_safe_move(self):
+        """
+        Returns a cell known to be safe that has not been played yet,
+        or None.
+        """
+        for safe_move in self.safe_moves:
+            return safe_move
+
+        return None
+
+    def make_random_move(self):
+        """
+        Returns a random cell that has not been played and is not known
+        to be a mine, or None if there is no such cell.
+        """
+        return self.candidates.choice()
+
+
+def neighbor_offsets(height, width):
+    """
+    Returns (kinds, offsets) for a board: the kind of each cell index,
+    telling which edges of the board the cell lies on, and for each kind
+    the list of (index offset, bit) pairs of the neighbors of a cell of
+    that kind, where bit is the neighbor's bit in a sentence mask over the
+    window starting one row and column before the cell.
+    """
+    kinds = bytearray(height * width)
+    for j in range(width):
+        kinds[j] |= 1
+        kinds[(height - 1) * width + j] |= 2
+    for i in range(height):
+        kinds[i * width] |= 4
+        kinds[i * width + width - 1] |= 8
+
+    offsets = []
+    for kind in range(16):
+        pairs = []
+        for k in range(-1, 2):
+            if((k == -1 and kind & 1) or (k == 1 and kind & 2)):
+                continue
+            for m in range(-1, 2):
+                if((m == -1 and kind & 4) or (m == 1 and kind & 8)):
+                    continue
+                if((k, m) != (0, 0)):
+                    pairs.append(
+                        (k * width + m, 1 << ((k + 1) * STRIDE + m + 1))
+                    )
+        offsets.append(pairs)
+    return kinds, offsets
+
+
+def normalize(row, col, mask):
+    """
+    Returns the (row, col, mask) of a non-empty mask over the window at
+    (`row`, `col`), moved to start at its first row and column holding a
+    cell.
+    """
+    while not mask & FIRST_ROW:
+        mask >>= STRIDE
+        row += 1
+    while not mask & FIRST_COLUMN:
+        mask >>= 1
+        col += 1
+    return row, col, mask
+
+
+def align(a, b):
+    """
+    Returns (row, col, a cells, b cells): the masks of sentences `a` and
+    `b`, which share a cell, over a window starting at both their first
+    rows and columns.
+    """
+    row = a.row if a.row < b.row else b.row
+    col = a.col if a.col < b.col else b.col
+    return (
+        row, col,
+        a.cells << ((a.row - row) * STRIDE + a.col - col),
+        b.cells << ((b.row - row) * STRIDE + b.col - col)
+    )
+
+
+def bits(mask):
+    """
+    Yields the index of every set bit of a mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
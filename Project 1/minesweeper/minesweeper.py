@@ -1,6 +1,11 @@
+import collections
 import itertools
+import math
 import random
-import copy
+
+# Maximum number of search nodes explored per move, across all frontier
+# components
+SEARCH_LIMIT = 30000
 
 class Minesweeper():
     """
@@ -77,6 +82,38 @@ class Minesweeper():
 
         return count
 
+    def reveal(self, cell, revealed=()):
+        """
+        Reveals a safe cell, and if it has no nearby mines, every cell of
+        the connected region of such cells and the border around it.
+        Cells in `revealed` are skipped.
+
+        Returns a list of (cell, count) pairs for the cells revealed,
+        where count is the cell's number of nearby mines.
+        """
+        result = []
+        visited = {cell}
+        queue = collections.deque([cell])
+
+        while len(queue) > 0:
+            current = queue.popleft()
+            count = self.nearby_mines(current)
+            result.append((current, count))
+
+            if count != 0:
+                continue
+
+            for i in range(current[0] - 1, current[0] + 2):
+                for j in range(current[1] - 1, current[1] + 2):
+                    if not (0 <= i < self.height and 0 <= j < self.width):
+                        continue
+                    if (i, j) in visited or (i, j) in revealed:
+                        continue
+                    visited.add((i, j))
+                    queue.append((i, j))
+
+        return result
+
     def won(self):
         """
         Checks if all mines have been flagged.
@@ -145,17 +182,70 @@ class Sentence():
         self.cells.remove(cell)
 
 
+class CellPool():
+    """
+    Set of cells supporting O(1) insertion, removal and uniform random
+    choice. Cells are kept in a list, with a dictionary from each cell to
+    its position; a removed cell is replaced by the last one in the list.
+    """
+
+    def __init__(self, cells=()):
+        self.cells = []
+        self.positions = dict()
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.positions
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def add(self, cell):
+        if(cell not in self.positions):
+            self.positions[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        position = self.positions.pop(cell, None)
+        if(position is None):
+            return
+
+        last = self.cells.pop()
+        if(position < len(self.cells)):
+            self.cells[position] = last
+            self.positions[last] = position
+
+    def choice(self):
+        """
+        Returns a uniformly random cell of the pool, or None if empty.
+        """
+        if(len(self.cells) == 0):
+            return None
+        return self.cells[random.randrange(len(self.cells))]
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, strategy="safest"):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known
+        self.total_mines = mines
+
+        # How random moves are chosen once mine probabilities are known:
+        # "safest" cell, "weighted" by probability of being safe, "uniform"
+        self.strategy = strategy
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -163,26 +253,159 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells not played yet, and cells neither played nor mines
+        self.safe_moves = set()
+        self.candidates = CellPool(
+            (i, j) for i in range(height) for j in range(width)
+        )
+
+        # Sentences about the game known to be true, keyed by sentence id
+        self.knowledge = dict()
+
+        # Ids of the sentences mentioning each cell
+        self.index = dict()
+
+        # Id of the sentence with given (cells, count), to drop duplicates
+        self.signatures = dict()
+        self.sentence_ids = itertools.count()
+
+        # Ids of sentences changed since they were last used for inference
+        self.pending = collections.deque()
+
+        # Mine probability for each undecided cell, from the last solve
+        self.probabilities = dict()
+
+        # Number of inference passes run over the knowledge base
+        self.inference_passes = 0
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
+        if(cell in self.mines):
+            return
+
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.candidates.discard(cell)
+        for sentence_id in self.index.pop(cell, set()):
+            self.update_sentence(sentence_id, lambda s: s.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if(cell in self.safes):
+            return
+
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if(cell not in self.moves_made):
+            self.safe_moves.add(cell)
+        for sentence_id in self.index.pop(cell, set()):
+            self.update_sentence(sentence_id, lambda s: s.mark_safe(cell))
+
+    def add_sentence(self, cells, count):
+        """
+        Adds the sentence `cells` = `count` to the knowledge base, after
+        removing cells already known to be safe or mines. Empty and
+        duplicate sentences are not added.
+
+        Returns the id of the new sentence, or None.
+        """
+        cells = set(cells) - self.safes
+        count -= len(cells & self.mines)
+        cells -= self.mines
+
+        signature = (frozenset(cells), count)
+        if(len(cells) == 0 or signature in self.signatures):
+            return None
+
+        sentence_id = next(self.sentence_ids)
+        self.knowledge[sentence_id] = Sentence(cells, count)
+        self.signatures[signature] = sentence_id
+        for cell in cells:
+            self.index.setdefault(cell, set()).add(sentence_id)
+
+        self.pending.append(sentence_id)
+        return sentence_id
+
+    def remove_sentence(self, sentence_id):
+        """
+        Removes a sentence and its index entries from the knowledge base.
+        """
+        sentence = self.knowledge.pop(sentence_id)
+        signature = (frozenset(sentence.cells), sentence.count)
+        if(self.signatures.get(signature) == sentence_id):
+            del self.signatures[signature]
+        for cell in sentence.cells:
+            self.index[cell].discard(sentence_id)
+
+    def update_sentence(self, sentence_id, change):
+        """
+        Applies `change` to a sentence whose index entry for the changed
+        cell has already been removed. The sentence is dropped if it ends up
+        empty or equal to another sentence, and queued for inference
+        otherwise.
+        """
+        sentence = self.knowledge[sentence_id]
+        del self.signatures[(frozenset(sentence.cells), sentence.count)]
+        change(sentence)
+
+        signature = (frozenset(sentence.cells), sentence.count)
+        if(len(sentence.cells) == 0 or signature in self.signatures):
+            self.remove_sentence(sentence_id)
+            return
+
+        self.signatures[signature] = sentence_id
+        self.pending.append(sentence_id)
+
+    def infer(self):
+        """
+        Draws conclusions from the queued sentences until no sentence is
+        left to process. Sentences with a known outcome mark their cells as
+        safe or as mines, and whenever one sentence's cells are a subset of
+        another's, the larger sentence is replaced by their difference.
+        Only sentences sharing a cell are ever compared.
+        """
+        while len(self.pending) > 0:
+            sentence_id = self.pending.popleft()
+            if(sentence_id not in self.knowledge):
+                continue
+
+            sentence = self.knowledge[sentence_id]
+
+            safes = sentence.known_safes()
+            mines = sentence.known_mines()
+            if(len(safes) != 0 or len(mines) != 0):
+                for safe in safes:
+                    self.mark_safe(safe)
+                for mine in mines:
+                    self.mark_mine(mine)
+                continue
+
+            related = set()
+            for cell in sentence.cells:
+                related.update(self.index[cell])
+            related.discard(sentence_id)
+
+            for other_id in related:
+                other = self.knowledge[other_id]
+
+                if(sentence.cells < other.cells):
+                    self.remove_sentence(other_id)
+                    self.add_sentence(
+                        other.cells - sentence.cells,
+                        other.count - sentence.count
+                    )
+
+                elif(other.cells < sentence.cells):
+                    self.remove_sentence(sentence_id)
+                    self.add_sentence(
+                        sentence.cells - other.cells,
+                        sentence.count - other.count
+                    )
+                    break
 
     def add_knowledge(self, cell, count):
         """
@@ -199,65 +422,318 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        self.add_knowledge_batch([(cell, count)])
 
-        # 1
-        self.moves_made.add(cell)
+    def add_knowledge_batch(self, reveals):
+        """
+        Adds the knowledge from a list of (cell, count) pairs, such as the
+        cells revealed together by Minesweeper.reveal, and then runs a
+        single inference pass.
+        """
 
-        # 2
-        self.mark_safe(cell)
+        # 1 and 2
+        for cell, count in reveals:
+            self.moves_made.add(cell)
+            self.safe_moves.discard(cell)
+            self.candidates.discard(cell)
+            self.mark_safe(cell)
 
         # 3
-        cell_neighbors = self.neighbors(cell)
-        cell_neighbors -= self.moves_made
-        cell_neighbors -= self.safes
+        for cell, count in reveals:
+            self.add_sentence(self.neighbors(cell), count)
 
-        print(cell_neighbors)
+        # 4 and 5
+        self.infer()
+        self.inference_passes += 1
 
-        new_sentence = Sentence(cell_neighbors, count)
-        self.knowledge.append(new_sentence)
+        # Fall back to the exact solver only when no safe move is known
+        self.probabilities = dict()
+        if(len(self.safe_moves) == 0):
+            self.solve()
+            self.infer()
 
-        # 4
-        tmp_mines = set()
-        tmp_safes = set()
-
-        for sentence in self.knowledge:
-            new_safes = sentence.known_safes()
-            new_mines = sentence.known_mines()
+    def solve(self):
+        """
+        Runs an exact solver over the frontier (the cells mentioned by any
+        sentence). The frontier is split into independent components and
+        each component's consistent mine configurations are enumerated with
+        backtracking. Cells that are mines (or safe) in every configuration
+        are marked, and the mine probability of every undecided cell is
+        stored in self.probabilities.
+
+        The components share a budget of SEARCH_LIMIT search nodes, and are
+        enumerated from the smallest up, so that a large component that
+        runs out of budget does not keep the others from being solved.
+        """
+        constraints = self.constraints()
+
+        unknown = set(self.candidates) - self.safe_moves
+
+        components = sorted(
+            self.components(constraints), key=lambda component: len(component[0])
+        )
+        results = []
+        frontier = set()
+        budget = SEARCH_LIMIT
+        for cells, component in components:
+            frontier.update(cells)
+            stats = dict()
+            results.append(
+                self.enumerate_component(cells, component, budget, stats)
+            )
+            budget -= stats["nodes"]
+
+        unconstrained = unknown - frontier
+        mines_left = None
+        if(self.total_mines is not None and None not in results):
+            mines_left = self.total_mines - len(self.mines)
+
+        probabilities = self.combine(results, len(unconstrained), mines_left)
+
+        for (cells, component), result in zip(components, results):
+            if(result is None):
+                for cell in cells:
+                    probabilities[cell] = self.local_probability(cell, constraints)
+
+        if(None in probabilities):
+            p = probabilities.pop(None)
+        elif(len(probabilities) != 0):
+            p = sum(probabilities.values()) / len(probabilities)
+        else:
+            p = None
+
+        if(p is not None):
+            for cell in unconstrained:
+                probabilities[cell] = p
+
+        for cell, p in probabilities.items():
+            if(p == 0):
+                self.mark_safe(cell)
+            elif(p == 1):
+                self.mark_mine(cell)
+
+        self.probabilities = {
+            cell: p for cell, p in probabilities.items() if 0 < p < 1
+        }
+
+    def constraints(self):
+        """
+        Returns the knowledge base as a list of (cells, count) constraints,
+        with known mines and safes removed and duplicates dropped.
+        """
+        constraints = set()
 
-            if(len(new_safes) != 0):
-                tmp_safes.update(new_safes)
+        for sentence in self.knowledge.values():
+            cells = sentence.cells - self.safes
+            count = sentence.count - len(cells & self.mines)
+            cells -= self.mines
 
-            if(len(new_mines) != 0):
-                tmp_mines.update(new_mines)
+            if(len(cells) != 0):
+                constraints.add((frozenset(cells), count))
 
-        for safe in tmp_safes:
-            self.mark_safe(safe)
+        return list(constraints)
 
-        for mine in tmp_mines:
-            self.mark_mine(mine)
+    def components(self, constraints):
+        """
+        Splits the constraints into independent components, two constraints
+        being connected when they share a cell. Yields (cells, constraints)
+        pairs, where cells is ordered so that neighbouring cells are assigned
+        one after the other during the search.
+        """
+        by_cell = dict()
+        for constraint in constraints:
+            for cell in constraint[0]:
+                by_cell.setdefault(cell, []).append(constraint)
+
+        visited = set()
+        for start in sorted(by_cell):
+            if(start in visited):
+                continue
+
+            cells = []
+            component = set()
+            queue = collections.deque([start])
+            visited.add(start)
+
+            while len(queue) > 0:
+                cell = queue.popleft()
+                cells.append(cell)
+                for constraint in by_cell[cell]:
+                    component.add(constraint)
+                    for other in sorted(constraint[0]):
+                        if(other not in visited):
+                            visited.add(other)
+                            queue.append(other)
+
+            yield cells, list(component)
+
+    def enumerate_component(self, cells, constraints, limit=SEARCH_LIMIT,
+                            stats=None):
+        """
+        Enumerates every mine configuration of `cells` that satisfies all
+        `constraints`, with backtracking. The search keeps its path in a
+        list rather than recursing, so its depth is not bounded by the
+        size of the component.
+
+        Returns a pair (counts, hits) where counts[k] is the number of
+        configurations with k mines and hits[k][cell] is how many of those
+        place a mine in `cell`. Returns None if the search exceeds `limit`
+        nodes. If `stats` is a dictionary, records in it the number of
+        "nodes" searched.
+        """
+        index = {cell: n for n, cell in enumerate(cells)}
+        by_cell = [[] for _ in cells]
+        mines = []
+        unassigned = []
+        for c, (constraint_cells, count) in enumerate(constraints):
+            mines.append(0)
+            unassigned.append(len(constraint_cells))
+            for cell in constraint_cells:
+                by_cell[index[cell]].append(c)
+
+        targets = [constraint[1] for constraint in constraints]
+        counts = dict()
+        hits = dict()
+
+        def consistent(n):
+            for c in by_cell[n]:
+                if(mines[c] > targets[c]):
+                    return False
+                if(mines[c] + unassigned[c] < targets[c]):
+                    return False
+            return True
+
+        # Values assigned to the first len(path) cells, and whether to go
+        # deeper from them or to move on to the next value
+        path = []
+        total = 0
+        nodes = 0
+        descend = True
+        while True:
+            if(descend):
+                n = len(path)
+                if(n == len(cells)):
+                    counts[total] = counts.get(total, 0) + 1
+                    cell_hits = hits.setdefault(total, [0] * len(cells))
+                    for m, value in enumerate(path):
+                        if(value):
+                            cell_hits[m] += 1
+                    descend = False
+                    continue
+                value = False
+            else:
+                if(len(path) == 0):
+                    break
+                n = len(path) - 1
+                value = path.pop()
+                total -= value
+                for c in by_cell[n]:
+                    unassigned[c] += 1
+                    mines[c] -= value
+                if(value):
+                    continue
+                value = True
 
-        # 5
-        inferences = []
-        knowledge_base = copy.deepcopy(self.knowledge)
-        
-        for sentence in knowledge_base:
-            for sentence2 in knowledge_base:
+            nodes += 1
+            if(nodes > limit):
+                break
 
-                set1 = sentence.cells
+            path.append(value)
+            total += value
+            for c in by_cell[n]:
+                unassigned[c] -= 1
+                mines[c] += value
+            descend = consistent(n)
 
-                set2 = sentence2.cells
+        if(stats is not None):
+            stats["nodes"] = min(nodes, limit)
+        if(nodes > limit):
+            return None
 
-                if(set1.issubset(set2) and sentence2 != sentence and len(set2) != 0 and len(set1) != 0 ):
-            
-                    infered_sentence = Sentence(set2 - set1, sentence2.count - sentence.count)
-                    
-                    if(sentence2 in self.knowledge):
-                        self.knowledge.remove(sentence2)
+        return counts, {
+            k: dict(zip(cells, cell_hits)) for k, cell_hits in hits.items()
+        }
 
-                    if(infered_sentence not in self.knowledge):
-                        inferences.append(infered_sentence)
+    def combine(self, results, unconstrained, mines_left):
+        """
+        Combines the per-component enumerations into a mine probability
+        for every frontier cell.
 
-        self.knowledge += inferences
+        If `mines_left` is known, each configuration is weighted by the
+        number of ways of placing the remaining mines among the
+        `unconstrained` cells, and the probability shared by every
+        unconstrained cell is returned under the key None.
+        """
+        probabilities = dict()
+        solved = [result for result in results if result is not None]
+
+        if(mines_left is None):
+            for counts, hits in solved:
+                total = sum(counts.values())
+                for cell in next(iter(hits.values()), []):
+                    n = sum(hits[k][cell] for k in hits)
+                    probabilities[cell] = n / total
+            return probabilities
+
+        def convolve(a, b):
+            result = dict()
+            for i, x in a.items():
+                for j, y in b.items():
+                    result[i + j] = result.get(i + j, 0) + x * y
+            return result
+
+        def ways(k):
+            if(k < 0 or k > unconstrained):
+                return 0
+            return math.comb(unconstrained, k)
+
+        everything = {0: 1}
+        for counts, hits in solved:
+            everything = convolve(everything, counts)
+
+        norm = sum(
+            n * ways(mines_left - k) for k, n in everything.items()
+        )
+        if(norm == 0):
+            return probabilities
+
+        for c, (counts, hits) in enumerate(solved):
+            others = {0: 1}
+            for d, (other_counts, other_hits) in enumerate(solved):
+                if(c != d):
+                    others = convolve(others, other_counts)
+
+            if(len(hits) == 0):
+                continue
+
+            for k in hits:
+                weight = sum(
+                    n * ways(mines_left - k - j) for j, n in others.items()
+                )
+                for cell, n in hits[k].items():
+                    probabilities[cell] = probabilities.get(cell, 0) + n * weight
+
+            for cell in hits[k]:
+                probabilities[cell] /= norm
+
+        if(unconstrained != 0):
+            expected = sum(
+                n * ways(mines_left - k) * (mines_left - k)
+                for k, n in everything.items()
+            )
+            probabilities[None] = expected / norm / unconstrained
+
+        return probabilities
+
+    def local_probability(self, cell, constraints):
+        """
+        Estimates the mine probability of `cell` as the highest mine
+        density among the constraints that mention it.
+        """
+        return max(
+            count / len(cells)
+            for cells, count in constraints if cell in cells
+        )
 
     def neighbors(self, cell):
         """
@@ -297,10 +773,8 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for safe_move in self.safes:
-            if(safe_move not in self.moves_made):
-                print('Safe Move:', safe_move)
-                return safe_move
+        for safe_move in self.safe_moves:
+            return safe_move
 
         return None
 
@@ -310,26 +784,38 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+
+        Once the solver has computed mine probabilities, the choice depends
+        on self.strategy: "safest" picks the cell least likely to be a mine,
+        "weighted" draws cells in proportion to their probability of being
+        safe, and "uniform" ignores the probabilities.
         """
+        if(len(self.probabilities) != 0 and self.strategy == "safest"):
+            return min(
+                self.probabilities,
+                key=lambda cell: (self.probabilities[cell], random.random())
+            )
 
-        random_move = self.generate_random_position()
+        if(len(self.probabilities) != 0 and self.strategy == "weighted"):
+            return self.weighted_move()
 
-        if(random_move not in self.mines and random_move not in self.moves_made):
-            print('Random Move:', random_move)
-            return random_move
-        return None
+        return self.candidates.choice()
 
-    def generate_random_position(self):
+    def weighted_move(self):
         """
-        Returns a generated random position in the board 
+        Returns a random candidate cell, drawn with probability proportional
+        to its probability of being safe. Cells are drawn uniformly from the
+        pool and accepted with probability (1 - p) / (1 - min p), so the
+        expected number of draws stays small unless every cell is very
+        likely to be a mine.
         """
-
-        row = random.randint(0, self.height - 1)
-        column = random.randint(0, self.width - 1)
-
-        move = (row, column)
-
-        if(move in self.moves_made):
-            return self.generate_random_position()
-
-        return move
+        default = sum(self.probabilities.values()) / len(self.probabilities)
+        best = 1 - min(min(self.probabilities.values()), default)
+
+        while True:
+            cell = self.candidates.choice()
+            if(cell is None):
+                return None
+            p = self.probabilities.get(cell, default)
+            if(random.random() * best <= 1 - p):
+                return cell
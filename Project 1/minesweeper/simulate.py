@@ -0,0 +1,166 @@
+import argparse
+import json
+import multiprocessing
+import random
+import statistics
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Minesweeper games with the AI, without a display."
+    )
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--mines", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument(
+        "--flood", action="store_true",
+        help="reveal regions without nearby mines in one move"
+    )
+    args = parser.parse_args()
+
+    games = simulate(
+        args.games, args.height, args.width, args.mines,
+        seed=args.seed, processes=args.processes, flood=args.flood
+    )
+    stats = summarize(games)
+    stats["board"] = {
+        "height": args.height,
+        "width": args.width,
+        "mines": args.mines
+    }
+    stats["seed"] = args.seed
+    stats["flood"] = args.flood
+    print(json.dumps(stats, indent=2))
+
+
+def simulate(games, height, width, mines, seed=0, processes=None,
+             flood=False):
+    """
+    Play `games` games across a pool of `processes` worker processes
+    (one per CPU if None). Game k is played with seed `seed + k`, so
+    results do not depend on the number of processes.
+
+    Return a list with the result of each game, as given by `play_game`.
+    """
+    tasks = [(height, width, mines, seed + k, flood) for k in range(games)]
+
+    if processes == 1:
+        return [play_game(*task) for task in tasks]
+
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(play_game, tasks, chunksize=16)
+
+
+def play_game(height, width, mines, seed, flood=False):
+    """
+    Play one game with the AI until it wins, hits a mine or runs out of
+    moves. Both the board and the AI draw from the `random` module,
+    which is seeded with `seed` first. If `flood` is True, each move
+    reveals the whole region given by Minesweeper.reveal and the AI
+    learns it with a single add_knowledge_batch call.
+
+    Return a dictionary with keys:
+        * won: whether the AI found every mine without hitting one,
+        * moves: number of moves made,
+        * revealed: number of cells revealed,
+        * passes: number of inference passes run by the AI,
+        * times: seconds spent choosing the move and updating the
+          knowledge base, for each move,
+        * knowledge: size of the knowledge base after each move.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+
+    result = {
+        "won": False, "moves": 0, "revealed": 0, "passes": 0,
+        "times": [], "knowledge": []
+    }
+
+    while True:
+        start = time.perf_counter()
+
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+
+        if move is None:
+            result["won"] = ai.mines == game.mines
+            result["passes"] = ai.inference_passes
+            return result
+
+        if game.is_mine(move):
+            result["passes"] = ai.inference_passes
+            return result
+
+        if flood:
+            reveals = game.reveal(move, ai.moves_made)
+            ai.add_knowledge_batch(reveals)
+            result["revealed"] += len(reveals)
+        else:
+            ai.add_knowledge(move, game.nearby_mines(move))
+            result["revealed"] += 1
+
+        result["times"].append(time.perf_counter() - start)
+        result["knowledge"].append(len(ai.knowledge))
+        result["moves"] += 1
+
+
+def summarize(games):
+    """
+    Return aggregate statistics for a list of `play_game` results.
+    """
+    times = sorted(t for game in games for t in game["times"])
+    moves = [game["moves"] for game in games]
+
+    # Mean size of the knowledge base after each move, over the games
+    # that lasted at least that long
+    knowledge = []
+    longest = max(moves, default=0)
+    for k in range(longest):
+        sizes = [
+            game["knowledge"][k] for game in games
+            if len(game["knowledge"]) > k
+        ]
+        knowledge.append(statistics.mean(sizes))
+
+    return {
+        "games": len(games),
+        "win_rate": sum(game["won"] for game in games) / max(len(games), 1),
+        "moves_per_game": mean(moves),
+        "revealed_per_game": mean(game["revealed"] for game in games),
+        "inference_passes_per_game": mean(game["passes"] for game in games),
+        "move_time_ms": {
+            "p50": 1000 * percentile(times, 0.50),
+            "p99": 1000 * percentile(times, 0.99),
+            "max": 1000 * times[-1] if times else 0
+        },
+        "knowledge_size": knowledge
+    }
+
+
+def mean(values):
+    """
+    Return the mean of an iterable of numbers (0 if empty).
+    """
+    values = list(values)
+    return statistics.mean(values) if values else 0
+
+
+def percentile(values, q):
+    """
+    Return the `q` quantile of a sorted list of values (0 if empty).
+    """
+    if len(values) == 0:
+        return 0
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from heredity import METHODS, infer_probabilities, load_data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute heredity probabilities for many family files."
+    )
+    parser.add_argument(
+        "source",
+        help="directory of family CSV files, or manifest listing one per line"
+    )
+    parser.add_argument("--method", choices=METHODS, default="propagation")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    filenames = family_files(args.source)
+    writer = WRITERS[args.format](sys.stdout)
+
+    start = time.perf_counter()
+    for filename, probabilities in run_batch(
+            filenames, args.method, args.processes):
+        writer(filename, probabilities)
+    elapsed = time.perf_counter() - start
+
+    rate = len(filenames) / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {len(filenames)} files in {elapsed:.3f}s "
+          f"({rate:.1f} files/sec)", file=sys.stderr)
+
+
+def family_files(source):
+    """
+    Return the family files to process: every .csv file in `source` if it
+    is a directory, or else the files listed in the manifest `source`, one
+    per line, relative to the manifest's directory.
+    """
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, filename)
+            for filename in os.listdir(source)
+            if filename.endswith(".csv")
+        )
+
+    base = os.path.dirname(source)
+    with open(source) as f:
+        return [
+            os.path.join(base, line.strip())
+            for line in f if line.strip()
+        ]
+
+
+def run_batch(filenames, method="propagation", processes=None):
+    """
+    Compute the probabilities of every file of `filenames` with `method`,
+    across a pool of `processes` worker processes (one per CPU if None).
+    Yield (filename, probabilities) pairs in the order of `filenames`, as
+    soon as each one is available.
+
+    Each worker imports the inference modules once, and the conditional
+    probability tables they compile from PROBS are cached for the life of
+    the worker rather than rebuilt for every file.
+    """
+    tasks = [(filename, method) for filename in filenames]
+
+    if processes == 1:
+        for task in tasks:
+            yield infer(task)
+        return
+
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(infer, tasks, chunksize=8)
+
+
+def infer(task):
+    """
+    Return (filename, probabilities) for a (filename, method) pair.
+    """
+    filename, method = task
+    probabilities, _ = infer_probabilities(load_data(filename), method)
+    return filename, probabilities
+
+
+def jsonl_writer(stream):
+    """
+    Return a function writing each file's results as one JSON object
+    per line.
+    """
+    def write(filename, probabilities):
+        stream.write(json.dumps({
+            "file": filename,
+            "probabilities": probabilities
+        }) + "\n")
+    return write
+
+
+def csv_writer(stream):
+    """
+    Return a function writing each file's results as CSV rows, one per
+    person, after a header row.
+    """
+    writer = csv.writer(stream)
+    writer.writerow([
+        "file", "name", "gene_2", "gene_1", "gene_0", "trait_true", "trait_false"
+    ])
+
+    def write(filename, probabilities):
+        for name, p in probabilities.items():
+            writer.writerow([
+                filename, name,
+                p["gene"][2], p["gene"][1], p["gene"][0],
+                p["trait"][True], p["trait"][False]
+            ])
+    return write
+
+
+WRITERS = {
+    "jsonl": jsonl_writer,
+    "csv": csv_writer
+}
+
+
+if __name__ == "__main__":
+    main()
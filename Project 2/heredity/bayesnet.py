@@ -0,0 +1,322 @@
+import functools
+import heapq
+import itertools
+
+from heredity import PROBS, probability_transfer
+
+# Possible values of each person's gene count
+GENES = (0, 1, 2)
+
+
+class Factor():
+    """
+    Nonnegative function over some gene variables. `table` maps each
+    tuple of gene counts, one for each of `variables` in order, to a value.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = table
+
+    def assignments(self):
+        """
+        Return an iterator over every tuple of values of the variables.
+        """
+        return itertools.product(GENES, repeat=len(self.variables))
+
+    def multiply(self, other):
+        """
+        Return the product of this factor and `other`.
+        """
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        left = [variables.index(v) for v in self.variables]
+        right = [variables.index(v) for v in other.variables]
+
+        table = dict()
+        for values in Factor(variables, {}).assignments():
+            table[values] = (
+                self.table[tuple(values[i] for i in left)] *
+                other.table[tuple(values[i] for i in right)]
+            )
+        return Factor(variables, table)
+
+    def sum_out(self, variable):
+        """
+        Return this factor with `variable` summed out.
+        """
+        position = self.variables.index(variable)
+        variables = self.variables[:position] + self.variables[position + 1:]
+
+        table = dict()
+        for values, p in self.table.items():
+            key = values[:position] + values[position + 1:]
+            table[key] = table.get(key, 0) + p
+        return Factor(variables, table)
+
+    def project(self, variables):
+        """
+        Return this factor with every variable not in `variables` summed out.
+        """
+        factor = self
+        for v in self.variables:
+            if v not in variables:
+                factor = factor.sum_out(v)
+        return factor
+
+    def divide(self, other):
+        """
+        Return this factor divided by `other`, whose variables must all be
+        among this factor's, taking 0 / 0 to be 0.
+        """
+        positions = [self.variables.index(v) for v in other.variables]
+        table = dict()
+        for values, p in self.table.items():
+            q = other.table[tuple(values[i] for i in positions)]
+            table[values] = p / q if q != 0 else 0
+        return Factor(self.variables, table)
+
+    def normalize(self):
+        """
+        Return this factor scaled so that its values sum to 1, which keeps
+        products over large pedigrees from underflowing.
+        """
+        total = sum(self.table.values())
+        if total == 0:
+            return self
+        return Factor(self.variables, {
+            values: p / total for values, p in self.table.items()
+        })
+
+
+@functools.lru_cache(maxsize=None)
+def inheritance_table():
+    """
+    Return a dictionary mapping (mother genes, father genes, child genes)
+    to the probability of the child's gene count given the parents'.
+    The table is computed once per process and shared, so it must not be
+    modified.
+    """
+    table = dict()
+    for mother, father in itertools.product(GENES, repeat=2):
+        m = probability_transfer(mother)
+        f = probability_transfer(father)
+        table[mother, father, 0] = (1 - m) * (1 - f)
+        table[mother, father, 1] = m * (1 - f) + f * (1 - m)
+        table[mother, father, 2] = m * f
+    return table
+
+
+def evidence(person):
+    """
+    Return a dictionary mapping each gene count to the probability of
+    the person's observed trait, or to 1 if the trait is unknown.
+    """
+    if person["trait"] is None:
+        return {genes: 1 for genes in GENES}
+    return {genes: PROBS["trait"][genes][person["trait"]] for genes in GENES}
+
+
+def compile_network(people, inheritance=None):
+    """
+    Compile the people loaded by `load_data` into a list of factors over
+    their gene counts: one per person, holding the gene probability
+    (unconditional, or given both parents) times the trait evidence.
+    `inheritance` may be passed to reuse an `inheritance_table`.
+    """
+    if inheritance is None:
+        inheritance = inheritance_table()
+
+    factors = []
+    for name, person in people.items():
+        likelihood = evidence(person)
+
+        if person["mother"] is None:
+            factors.append(Factor((name,), {
+                (genes,): PROBS["gene"][genes] * likelihood[genes]
+                for genes in GENES
+            }))
+        else:
+            factors.append(Factor(
+                (person["mother"], person["father"], name),
+                {
+                    values: p * likelihood[values[2]]
+                    for values, p in inheritance.items()
+                }
+            ))
+
+    return factors
+
+
+def interaction_graph(factors):
+    """
+    Return a dictionary mapping each variable of `factors` to the set of
+    variables it shares a factor with.
+    """
+    graph = dict()
+    for factor in factors:
+        for v in factor.variables:
+            graph.setdefault(v, set()).update(factor.variables)
+            graph[v].discard(v)
+    return graph
+
+
+def elimination_order(factors):
+    """
+    Return an order in which to eliminate every variable of `factors`,
+    choosing greedily the variable whose elimination adds the fewest new
+    edges to the interaction graph (min-fill), breaking ties by degree.
+    Scores are kept in a heap and only recomputed for the neighbors of
+    each eliminated variable.
+    """
+    graph = interaction_graph(factors)
+
+    def score(v):
+        fill = sum(
+            1 for a, b in itertools.combinations(graph[v], 2)
+            if b not in graph[a]
+        )
+        return (fill, len(graph[v]))
+
+    scores = {v: score(v) for v in graph}
+    heap = [(scores[v], str(v), v) for v in graph]
+    heapq.heapify(heap)
+
+    order = []
+    while len(heap) > 0:
+        key, _, v = heapq.heappop(heap)
+        if v not in graph or scores[v] != key:
+            continue
+
+        neighbors = graph.pop(v)
+        for a, b in itertools.combinations(neighbors, 2):
+            graph[a].add(b)
+            graph[b].add(a)
+        for a in neighbors:
+            graph[a].discard(v)
+
+        # Elimination only changes the scores of v's neighbors and of
+        # their own neighbors, whose fill counts may have dropped
+        changed = set(neighbors)
+        for a in neighbors:
+            changed.update(graph[a])
+        for a in changed:
+            scores[a] = score(a)
+            heapq.heappush(heap, (scores[a], str(a), a))
+
+        order.append(v)
+
+    return order
+
+
+def eliminate(factors, order, clusters=None):
+    """
+    Sum every variable of `order` out of the product of `factors`.
+    Return the list of remaining factors.
+
+    If `clusters` is a dictionary, record in it, for each variable
+    eliminated, the (product, message) pair of the product of the factors
+    it was summed out of and the factor that summing it out produced.
+    """
+    by_variable = dict()
+    for factor in factors:
+        for v in factor.variables:
+            by_variable.setdefault(v, []).append(factor)
+
+    remaining = set(factors)
+    for v in order:
+        involved = [f for f in by_variable.pop(v, []) if f in remaining]
+        if len(involved) == 0:
+            continue
+
+        product = involved[0]
+        for factor in involved[1:]:
+            product = product.multiply(factor)
+        remaining.difference_update(involved)
+
+        result = product.sum_out(v).normalize()
+        if clusters is not None:
+            clusters[v] = (product, result)
+        remaining.add(result)
+        for u in result.variables:
+            by_variable[u].append(result)
+
+    return list(remaining)
+
+
+def variable_elimination(people):
+    """
+    Compute each person's gene and trait distributions given the observed
+    traits, with variable elimination over the compiled factors.
+
+    Every marginal comes from one elimination: each variable's cluster,
+    the product it was summed out of, sends its message to the cluster of
+    the first variable of the message eliminated after it, which makes a
+    tree. A downward pass over that tree, from the last cluster back to
+    the first, turns each cluster into the joint marginal of its
+    variables, by multiplying in the parent's marginal of the message's
+    variables divided by the message itself.
+
+    Return a dictionary in the format returned by
+    `heredity.enumerate_probabilities`.
+    """
+    factors = compile_network(people)
+    order = elimination_order(factors)
+    position = {v: k for k, v in enumerate(order)}
+    clusters = dict()
+    eliminate(factors, order, clusters)
+
+    beliefs = dict()
+    for v in reversed(order):
+        product, message = clusters[v]
+        if len(message.variables) == 0:
+            beliefs[v] = product.normalize()
+            continue
+        parent = min(message.variables, key=lambda u: position[u])
+        downward = beliefs[parent].project(message.variables).divide(message)
+        beliefs[v] = product.multiply(downward).normalize()
+
+    probabilities = dict()
+    for name in people:
+        marginal = beliefs[name].project((name,))
+        probabilities[name] = distributions(people[name], {
+            genes: marginal.table[(genes,)] for genes in GENES
+        })
+
+    return probabilities
+
+
+def query(people, name):
+    """
+    Compute the gene and trait distributions of the single person `name`
+    given the observed traits, by summing every other variable out of the
+    compiled factors. Return them in the format of one person's entry of
+    `heredity.enumerate_probabilities`.
+    """
+    factors = compile_network(people)
+    order = [v for v in elimination_order(factors) if v != name]
+    marginal = {genes: 1 for genes in GENES}
+    for factor in eliminate(factors, order):
+        if factor.variables == (name,):
+            for (genes,), p in factor.table.items():
+                marginal[genes] *= p
+
+    return distributions(people[name], marginal)
+
+
+def distributions(person, marginal):
+    """
+    Return the normalized gene and trait distributions of `person`, given
+    an unnormalized `marginal` mapping gene counts to probabilities.
+    """
+    total = sum(marginal.values())
+    gene = {genes: marginal[genes] / total for genes in (2, 1, 0)}
+
+    if person["trait"] is not None:
+        trait = {True: float(person["trait"]), False: float(not person["trait"])}
+    else:
+        p = sum(gene[genes] * PROBS["trait"][genes][True] for genes in GENES)
+        trait = {True: p, False: 1 - p}
+
+    return {"gene": gene, "trait": trait}
@@ -0,0 +1,201 @@
+import csv
+import os
+import random
+import sys
+import time
+
+from bayesnet import variable_elimination
+from heredity import enumerate_probabilities, enumerate_pruned, load_data
+from propagation import belief_propagation
+from sampling import sample_probabilities
+from vectorized import enumerate_vectorized
+
+# Inference method, pedigree sizes and share of marriages to outsiders
+# (1.0 gives loop-free pedigrees) for each benchmark run
+RUNS = [
+    (enumerate_probabilities, [3, 4, 5, 6], 0.95),
+    (enumerate_vectorized, [3, 4, 5, 6, 7, 8, 9], 0.95),
+    (variable_elimination, [20, 50, 100, 200, 500, 1000], 0.95),
+    (belief_propagation, [100, 1000, 10000], 1.0),
+    (belief_propagation, [100, 1000, 10000], 0.99)
+]
+
+# Sample budgets for the sampling benchmark
+SAMPLES = [1000, 10000, 100000]
+
+# Pedigree sizes and pruning thresholds for the pruning benchmark
+PRUNING_SIZES = [5, 6, 8, 10]
+EPSILONS = [0, 1e-12, 1e-9]
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [1, 2, 3] or (
+            len(sys.argv) > 1 and sys.argv[1] not in BENCHMARKS):
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [seed]")
+    name = sys.argv[1] if len(sys.argv) > 1 else "scaling"
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 else 0
+
+    BENCHMARKS[name](seed)
+
+
+def benchmark_scaling(seed):
+    """
+    Time each exact inference method on generated pedigrees of
+    increasing size.
+    """
+    for method, sizes, outsiders in RUNS:
+        print(f"{method.__name__} (outsiders: {outsiders}):")
+        for size in sizes:
+            people = generate_pedigree(size, seed, outsiders=outsiders)
+            start = time.perf_counter()
+            method(people)
+            elapsed = time.perf_counter() - start
+            print(f"  {size} people: {elapsed:.3f}s")
+
+
+def benchmark_sampling(seed):
+    """
+    Compare the sampling methods' accuracy and running time against the
+    exact results on the families in the data directory.
+    """
+    for filename in sorted(os.listdir("data")):
+        people = load_data(os.path.join("data", filename))
+        exact = enumerate_probabilities(people)
+        print(f"{filename}:")
+
+        for method in ["likelihood", "gibbs"]:
+            for samples in SAMPLES:
+                start = time.perf_counter()
+                probabilities, errors = sample_probabilities(
+                    people, method=method, samples=samples, seed=seed
+                )
+                elapsed = time.perf_counter() - start
+
+                error = max(
+                    abs(probabilities[name][field][value] - p)
+                    for name in exact
+                    for field in exact[name]
+                    for value, p in exact[name][field].items()
+                )
+                spread = max(
+                    e for name in errors
+                    for field in errors[name]
+                    for e in errors[name][field].values()
+                )
+                print(f"  {method}, {samples} samples: {elapsed:.3f}s, "
+                      f"max error {error:.4f}, max standard error {spread:.4f}")
+
+
+def benchmark_pruning(seed):
+    """
+    Compare the number of states evaluated by `enumerate_probabilities`
+    (one joint probability per gene and trait assignment consistent with
+    the evidence) with the number evaluated by `enumerate_pruned` at each
+    threshold, with its running time and largest error.
+    """
+    families = [
+        (filename, load_data(os.path.join("data", filename)))
+        for filename in sorted(os.listdir("data"))
+    ] + [
+        (f"{size} people", generate_pedigree(size, seed))
+        for size in PRUNING_SIZES
+    ]
+
+    for label, people in families:
+        unknown = sum(person["trait"] is None for person in people.values())
+        states = 3 ** len(people) * 2 ** unknown
+        print(f"{label}: enumeration evaluates {states} states")
+
+        exact = None
+        for epsilon in EPSILONS:
+            stats = dict()
+            start = time.perf_counter()
+            probabilities = enumerate_pruned(people, epsilon, stats)
+            elapsed = time.perf_counter() - start
+            if exact is None:
+                exact = probabilities
+
+            error = max(
+                abs(probabilities[name][field][value] - p)
+                for name in exact
+                for field in exact[name]
+                for value, p in exact[name][field].items()
+            )
+            print(f"  epsilon {epsilon:g}: {stats['states']} states "
+                  f"({states / stats['states']:.1f}x fewer), "
+                  f"{stats['pruned']} branches pruned, "
+                  f"{elapsed:.3f}s, max error {error:.2e}")
+
+
+def generate_pedigree(size, seed=0, outsiders=0.95, observed=0.5, window=20):
+    """
+    Generate a random pedigree of `size` people, in the format returned by
+    `load_data`.
+
+    The pedigree starts with a founder couple. Each new child is given to
+    one of the `window` most recent couples, and one of the `window` most
+    recent unmarried children is married either to a new founder (with
+    probability `outsiders`) or to another unmarried child born around the
+    same time, which creates loops as in real pedigrees. Each person's trait is known with probability
+    `observed`, in which case it is True with probability 0.3.
+    """
+    rng = random.Random(seed)
+    people = dict()
+    couples = []
+    unmarried = []
+
+    def add(mother=None, father=None):
+        name = f"P{len(people)}"
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": rng.random() < 0.3 if rng.random() < observed else None
+        }
+        return name
+
+    couples.append((add(), add()))
+    while len(people) < size:
+        if len(unmarried) > 0 and rng.random() < 0.4:
+            k = rng.randrange(max(len(unmarried) - window, 0), len(unmarried))
+            spouse = unmarried.pop(k)
+            if rng.random() < outsiders or len(unmarried) == 0:
+                partner = add()
+            else:
+                low = max(k - window, 0)
+                high = min(k + window, len(unmarried))
+                partner = unmarried.pop(rng.randrange(low, high))
+            couples.append((spouse, partner))
+        else:
+            mother, father = rng.choice(couples[-window:])
+            unmarried.append(add(mother, father))
+
+    return people
+
+
+def write_pedigree(people, filename):
+    """
+    Write `people` to a CSV file that `load_data` can read.
+    """
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "mother", "father", "trait"])
+        for person in people.values():
+            trait = "" if person["trait"] is None else int(person["trait"])
+            writer.writerow([
+                person["name"], person["mother"] or "",
+                person["father"] or "", trait
+            ])
+
+
+BENCHMARKS = {
+    "scaling": benchmark_scaling,
+    "sampling": benchmark_sampling,
+    "pruning": benchmark_pruning
+}
+
+
+if __name__ == "__main__":
+    main()
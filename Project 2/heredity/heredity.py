@@ -36,13 +36,80 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Inference methods available from the command line and to batches
+METHODS = [
+    "pruned", "enumeration", "vectorized", "elimination", "propagation",
+    "likelihood", "gibbs"
+]
+
+# Partial probability below which `enumerate_pruned` abandons a branch;
+# 0 keeps every branch that can contribute, for exact results
+EPSILON = 0
+
+# Number of samples drawn by the sampling methods
+SAMPLES = 100000
+
 
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3] or (
+            len(sys.argv) == 3 and sys.argv[2] not in METHODS):
+        sys.exit(f"Usage: python heredity.py data.csv [{'|'.join(METHODS)}]")
     people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) == 3 else "pruned"
+
+    # Compute gene and trait probabilities for each person
+    probabilities, errors = infer_probabilities(people, method)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                if errors is None:
+                    print(f"    {value}: {p:.4f}")
+                else:
+                    error = errors[person][field][value]
+                    print(f"    {value}: {p:.4f} ± {error:.4f}")
+
+
+def infer_probabilities(people, method="pruned"):
+    """
+    Compute each person's gene and trait distributions with `method`, one
+    of METHODS. Return (probabilities, errors): the distributions in the
+    format returned by `enumerate_probabilities`, and the standard error
+    of each value in the same format for the sampling methods, or None
+    for the exact ones.
+    """
+    if method in ["likelihood", "gibbs"]:
+        from sampling import sample_probabilities
+        return sample_probabilities(people, method=method, samples=SAMPLES)
+    elif method == "elimination":
+        from bayesnet import variable_elimination
+        probabilities = variable_elimination(people)
+    elif method == "vectorized":
+        from vectorized import enumerate_vectorized
+        probabilities = enumerate_vectorized(people)
+    elif method == "propagation":
+        from propagation import belief_propagation
+        probabilities = belief_propagation(people)
+    elif method == "enumeration":
+        probabilities = enumerate_probabilities(people)
+    elif method == "pruned":
+        probabilities = enumerate_pruned(people)
+    else:
+        raise ValueError(f"unknown method: {method}")
+    return probabilities, None
+
+
+def enumerate_probabilities(people):
+    """
+    Compute each person's gene and trait distributions by enumerating
+    every assignment of genes and traits consistent with the evidence.
+    """
 
     # Keep track of gene and trait probabilities for each person
     probabilities = {
@@ -60,8 +127,16 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
+    # Every way of splitting people into one gene and two genes, listed
+    # once rather than for every set of people with the trait
     names = set(people)
+    gene_sets = [
+        (one_gene, two_genes)
+        for one_gene in powerset(names)
+        for two_genes in powerset(names - one_gene)
+    ]
+
+    # Loop over all sets of people who might have the trait
     for have_trait in powerset(names):
 
         # Check if current set of people violates known information
@@ -74,24 +149,119 @@ def main():
             continue
 
         # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
+        for one_gene, two_genes in gene_sets:
 
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+            # Update probabilities with new joint probability
+            p = joint_probability(people, one_gene, two_genes, have_trait)
+            update(probabilities, one_gene, two_genes, have_trait, p)
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
+
+
+def enumerate_pruned(people, epsilon=EPSILON, stats=None):
+    """
+    Compute each person's gene and trait distributions by a depth-first
+    enumeration of gene assignments, parents before children, carrying
+    the product of the probabilities assigned so far.
+
+    Observed traits are fixed up front: each person's gene probability is
+    multiplied by the likelihood of their observed trait, and unknown
+    traits are summed out from the genes at each complete assignment
+    rather than enumerated. Branches whose partial probability is 0 or
+    below `epsilon` are abandoned, as they cannot contribute more than
+    that; with an `epsilon` of 0 the results are exact.
+
+    If `stats` is a dictionary, record in it the number of "states"
+    (partial assignments) evaluated, the number of branches "pruned" and
+    the number of complete "assignments" reached.
+
+    Return a dictionary in the format returned by `enumerate_probabilities`.
+    """
+    order = parents_first(people)
+    transfer = [probability_transfer(genes) for genes in range(3)]
+    totals = {name: [0, 0, 0, 0, 0] for name in people}
+    genes = dict()
+    counts = {"states": 0, "pruned": 0, "assignments": 0}
+
+    def gene_probability(person, num_genes):
+        if person["mother"] is None:
+            return PROBS["gene"][num_genes]
+        m = transfer[genes[person["mother"]]]
+        f = transfer[genes[person["father"]]]
+        if(num_genes == 0):
+            return (1 - m) * (1 - f)
+        elif(num_genes == 1):
+            return m * (1 - f) + f * (1 - m)
+        return m * f
+
+    def visit(k, p):
+        counts["states"] += 1
+        if k == len(order):
+            counts["assignments"] += 1
+            for name, num_genes in genes.items():
+                totals[name][num_genes] += p
+                trait = people[name]["trait"]
+                if trait is None:
+                    totals[name][3] += p * PROBS["trait"][num_genes][True]
+                    totals[name][4] += p * PROBS["trait"][num_genes][False]
+                else:
+                    totals[name][3 if trait else 4] += p
+            return
+
+        person = people[order[k]]
+        for num_genes in range(3):
+            q = p * gene_probability(person, num_genes)
+            if person["trait"] is not None:
+                q *= PROBS["trait"][num_genes][person["trait"]]
+            if q == 0 or q < epsilon:
+                counts["pruned"] += 1
+                continue
+            genes[order[k]] = num_genes
+            visit(k + 1, q)
+        genes.pop(order[k], None)
+
+    visit(0, 1)
+    if stats is not None:
+        stats.update(counts)
+
+    probabilities = dict()
+    for name, (zero, one, two, trait, no_trait) in totals.items():
+        total = zero + one + two
+        probabilities[name] = {
+            "gene": {2: two / total, 1: one / total, 0: zero / total},
+            "trait": {True: trait / total, False: no_trait / total}
+        }
+    return probabilities
+
+
+def parents_first(people):
+    """
+    Return the names of `people` ordered so that parents come before
+    their children.
+    """
+    order = []
+    placed = set()
+    for name in people:
+        stack = [name]
+        while len(stack) > 0:
+            current = stack[-1]
+            if current in placed:
+                stack.pop()
+                continue
+            parents = [
+                p for p in (people[current]["mother"], people[current]["father"])
+                if p is not None and p not in placed
+            ]
+            if len(parents) == 0:
+                placed.add(current)
+                order.append(current)
+                stack.pop()
+            else:
+                stack.extend(parents)
+    return order
 
 
 def load_data(filename):
@@ -220,10 +390,7 @@ def normalize(probabilities):
     
 
 def hasItemInSet(item, data_set):
-    for i in data_set:
-        if(item == i):
-            return True
-    return False
+    return item in data_set
 
 
 def probability_transfer(num_genes):
@@ -0,0 +1,237 @@
+import collections
+
+from bayesnet import (
+    GENES, Factor, compile_network, distributions, elimination_order,
+    interaction_graph
+)
+
+
+class CliqueTree():
+    """
+    Tree (or forest) of cliques of gene variables. Each clique holds a
+    potential, the product of the factors assigned to it, and neighboring
+    cliques share the variables of their separator.
+    """
+
+    def __init__(self):
+        self.cliques = []
+        self.potentials = []
+        self.neighbors = []
+
+    def add_clique(self, variables):
+        """
+        Add a clique over `variables` with a potential of 1 everywhere.
+        Return its index.
+        """
+        variables = tuple(variables)
+        table = {
+            values: 1 for values in Factor(variables, {}).assignments()
+        }
+        self.cliques.append(variables)
+        self.potentials.append(Factor(variables, table))
+        self.neighbors.append([])
+        return len(self.cliques) - 1
+
+    def add_edge(self, a, b):
+        self.neighbors[a].append(b)
+        self.neighbors[b].append(a)
+
+    def assign(self, clique, factor):
+        """
+        Multiply `factor` into the potential of `clique`, which must
+        contain all of the factor's variables.
+        """
+        product = self.potentials[clique].multiply(factor)
+        self.potentials[clique] = product.project(self.cliques[clique])
+
+    def separator(self, a, b):
+        return tuple(v for v in self.cliques[a] if v in self.cliques[b])
+
+    def calibrate(self):
+        """
+        Run sum-product message passing: one upward pass from the leaves
+        to the root of each tree, then one downward pass back to the
+        leaves. Return the belief of every clique, proportional to the
+        marginal of its variables given the evidence.
+        """
+
+        # Order cliques so that every clique comes after its parent
+        parent = [None] * len(self.cliques)
+        order = []
+        visited = set()
+        for root in range(len(self.cliques)):
+            if root in visited:
+                continue
+            visited.add(root)
+            queue = collections.deque([root])
+            while len(queue) > 0:
+                clique = queue.popleft()
+                order.append(clique)
+                for neighbor in self.neighbors[clique]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        parent[neighbor] = clique
+                        queue.append(neighbor)
+
+        # Upward pass: each clique sends its parent a message summarizing
+        # the evidence in its subtree
+        up = dict()
+        for clique in reversed(order):
+            if parent[clique] is None:
+                continue
+            factor = self.potentials[clique]
+            for neighbor in self.neighbors[clique]:
+                if neighbor != parent[clique]:
+                    factor = factor.multiply(up[neighbor])
+            up[clique] = factor.project(
+                self.separator(clique, parent[clique])
+            ).normalize()
+
+        # Downward pass: each clique sends each child a message
+        # summarizing the evidence outside of the child's subtree
+        down = dict()
+        beliefs = [None] * len(self.cliques)
+        for clique in order:
+            incoming = [
+                up[neighbor] for neighbor in self.neighbors[clique]
+                if neighbor != parent[clique]
+            ]
+            if parent[clique] is not None:
+                incoming.append(down[clique])
+
+            beliefs[clique] = self.potentials[clique]
+            for message in incoming:
+                beliefs[clique] = beliefs[clique].multiply(message)
+
+            children = [
+                neighbor for neighbor in self.neighbors[clique]
+                if neighbor != parent[clique]
+            ]
+            for child, others in zip(children, excluding(incoming)):
+                factor = self.potentials[clique]
+                for message in others:
+                    factor = factor.multiply(message)
+                down[child] = factor.project(
+                    self.separator(clique, child)
+                ).normalize()
+
+        return beliefs
+
+
+def excluding(messages):
+    """
+    Yield, for each message of `messages`, the list of all other messages.
+    """
+    for i in range(len(messages)):
+        yield messages[:i] + messages[i + 1:]
+
+
+def pedigree_tree(people, factors):
+    """
+    Build a clique tree following the structure of the pedigree: one
+    clique per person (the person with their parents, if any), and one
+    clique per couple, linking the couple's own cliques to the cliques of
+    their children. Return None if the pedigree has a loop (inbreeding,
+    or a marriage loop such as two siblings marrying two siblings), in
+    which case no such tree exists.
+    """
+    tree = CliqueTree()
+    own = dict()
+    for name, factor in zip(people, factors):
+        own[name] = tree.add_clique(factor.variables)
+        tree.assign(own[name], factor)
+
+    # Union-find over cliques, to detect loops as edges are added
+    root = list(range(len(tree.cliques)))
+
+    def find(x):
+        while root[x] != x:
+            root[x] = root[root[x]]
+            x = root[x]
+        return x
+
+    couples = dict()
+    for name, person in people.items():
+        if person["mother"] is None:
+            continue
+
+        couple = (person["mother"], person["father"])
+        links = [own[name]]
+        if couple not in couples:
+            couples[couple] = tree.add_clique(couple)
+            root.append(couples[couple])
+            links += [own[couple[0]], own[couple[1]]]
+
+        for clique in links:
+            a, b = find(clique), find(couples[couple])
+            if a == b:
+                return None
+            root[a] = b
+            tree.add_edge(clique, couples[couple])
+
+    return tree
+
+
+def junction_tree(factors):
+    """
+    Build a junction tree for any pedigree from the cliques created by
+    eliminating the variables of `factors` in min-fill order.
+    """
+    graph = interaction_graph(factors)
+    order = elimination_order(factors)
+    position = {v: k for k, v in enumerate(order)}
+
+    tree = CliqueTree()
+    created = dict()
+    for v in order:
+        neighbors = graph.pop(v)
+        created[v] = tree.add_clique((v,) + tuple(neighbors))
+        for a in neighbors:
+            graph[a].discard(v)
+            graph[a].update(neighbors - {a})
+
+    # Each clique hangs from the clique of its first eliminated neighbor
+    for v in order:
+        rest = [a for a in tree.cliques[created[v]] if a != v]
+        if len(rest) > 0:
+            first = min(rest, key=lambda a: position[a])
+            tree.add_edge(created[v], created[first])
+
+    # Each factor goes to the clique of its first eliminated variable
+    for factor in factors:
+        first = min(factor.variables, key=lambda a: position[a])
+        tree.assign(created[first], factor)
+
+    return tree
+
+
+def belief_propagation(people):
+    """
+    Compute each person's gene and trait distributions given the observed
+    traits, by message passing over a clique tree: the pedigree's own
+    structure if it has no loops, or a junction tree otherwise.
+
+    Return a dictionary in the format returned by
+    `heredity.enumerate_probabilities`.
+    """
+    factors = compile_network(people)
+    tree = pedigree_tree(people, factors)
+    if tree is None:
+        tree = junction_tree(factors)
+    beliefs = tree.calibrate()
+
+    # Read each person's marginal from the smallest clique containing them
+    smallest = dict()
+    for clique, variables in enumerate(tree.cliques):
+        for v in variables:
+            if v not in smallest or len(variables) < len(tree.cliques[smallest[v]]):
+                smallest[v] = clique
+
+    probabilities = dict()
+    for name in people:
+        marginal = beliefs[smallest[name]].project((name,))
+        probabilities[name] = distributions(people[name], {
+            genes: marginal.table[(genes,)] for genes in GENES
+        })
+
+    return probabilities
@@ -0,0 +1,212 @@
+import math
+import multiprocessing
+import random
+
+from heredity import PROBS, parents_first
+from bayesnet import GENES, inheritance_table
+
+# Number of batches each chain's samples are split into, to estimate
+# standard errors from the spread of the batch estimates
+BATCHES = 20
+
+
+def sample_probabilities(people, method="likelihood", samples=10000, seed=0,
+                         chains=1, processes=None):
+    """
+    Estimate each person's gene and trait distributions by sampling, with
+    `method` either "likelihood" (likelihood weighting) or "gibbs"
+    (Gibbs sampling). `samples` are split over `chains` independent
+    chains, seeded with `seed`, `seed + 1`, ... and run across a pool of
+    `processes` worker processes if there is more than one chain.
+
+    Return a pair (probabilities, errors) of dictionaries in the format
+    returned by `heredity.enumerate_probabilities`: the estimates and
+    their standard errors.
+    """
+    tasks = [
+        (people, method, samples // chains, seed + k)
+        for k in range(chains)
+    ]
+    if chains == 1 or processes == 1:
+        results = [run_chain(*task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(run_chain, tasks)
+
+    batches = [batch for result in results for batch in result]
+    return estimate(people, batches)
+
+
+def run_chain(people, method, samples, seed):
+    """
+    Run one chain of `samples` samples. Return a list of batches, each a
+    pair (weight, totals) where `totals[name]` holds the weighted number
+    of samples in which the person has 0, 1 and 2 genes, followed by the
+    weighted probability of the person having the trait.
+    """
+    rng = random.Random(seed)
+    if method == "likelihood":
+        draw = LikelihoodWeighting(people, rng)
+    elif method == "gibbs":
+        draw = GibbsSampler(people, rng)
+    else:
+        raise ValueError(f"unknown sampling method: {method}")
+
+    size = max(samples // BATCHES, 1)
+    batches = []
+    for start in range(0, samples, size):
+        weight = 0
+        totals = {name: [0, 0, 0, 0] for name in people}
+        for _ in range(min(size, samples - start)):
+            genes, w = draw()
+            weight += w
+            for name, g in genes.items():
+                totals[name][g] += w
+                totals[name][3] += w * trait_probability(people[name], g)
+        batches.append((weight, totals))
+
+    return batches
+
+
+def trait_probability(person, genes):
+    """
+    Return the probability that `person` has the trait given their genes:
+    their observed trait if known, the model's probability otherwise.
+    """
+    if person["trait"] is not None:
+        return float(person["trait"])
+    return PROBS["trait"][genes][True]
+
+
+def estimate(people, batches):
+    """
+    Combine batches from `run_chain` into estimates and standard errors.
+    """
+    weight = sum(w for w, _ in batches)
+    probabilities = dict()
+    errors = dict()
+
+    for name in people:
+        values = []
+        spreads = []
+        for k in range(4):
+            total = sum(totals[name][k] for _, totals in batches)
+            mean = total / weight
+            estimates = [totals[name][k] / w for w, totals in batches if w > 0]
+            if len(estimates) > 1:
+                variance = sum((x - mean) ** 2 for x in estimates)
+                spread = math.sqrt(variance / (len(estimates) - 1) / len(estimates))
+            else:
+                spread = float("nan")
+            values.append(mean)
+            spreads.append(spread)
+
+        probabilities[name] = {
+            "gene": {g: values[g] for g in (2, 1, 0)},
+            "trait": {True: values[3], False: 1 - values[3]}
+        }
+        errors[name] = {
+            "gene": {g: spreads[g] for g in (2, 1, 0)},
+            "trait": {True: spreads[3], False: spreads[3]}
+        }
+
+    return probabilities, errors
+
+
+def choose(rng, weights):
+    """
+    Return 0, 1 or 2 with probability proportional to `weights`.
+    """
+    x = rng.random() * sum(weights)
+    if x < weights[0]:
+        return 0
+    if x < weights[0] + weights[1]:
+        return 1
+    return 2
+
+
+class LikelihoodWeighting():
+    """
+    Draws gene assignments from the model, parents first, and weights
+    each one by the likelihood of the observed traits.
+    """
+
+    def __init__(self, people, rng):
+        self.people = people
+        self.rng = rng
+        self.order = parents_first(people)
+        self.inheritance = inheritance_table()
+
+    def __call__(self):
+        genes = dict()
+        weight = 1
+        for name in self.order:
+            person = self.people[name]
+            if person["mother"] is None:
+                weights = [PROBS["gene"][g] for g in GENES]
+            else:
+                m = genes[person["mother"]]
+                f = genes[person["father"]]
+                weights = [self.inheritance[m, f, g] for g in GENES]
+            genes[name] = choose(self.rng, weights)
+
+            if person["trait"] is not None:
+                weight *= PROBS["trait"][genes[name]][person["trait"]]
+
+        return genes, weight
+
+
+class GibbsSampler():
+    """
+    Resamples each person's genes in turn given everyone else's, from
+    the gene probability given their parents, the likelihood of their
+    observed trait and the probability of their children's genes. Each
+    call makes one sweep over everybody, after a burn-in of BURN_IN sweeps.
+    """
+
+    BURN_IN = 100
+
+    def __init__(self, people, rng):
+        self.people = people
+        self.rng = rng
+        self.inheritance = inheritance_table()
+
+        # Children of each person, with the child's other parent
+        self.children = {name: [] for name in people}
+        for name, person in people.items():
+            if person["mother"] is not None:
+                self.children[person["mother"]].append(
+                    (name, person["father"], True)
+                )
+                self.children[person["father"]].append(
+                    (name, person["mother"], False)
+                )
+
+        self.genes, _ = LikelihoodWeighting(people, rng)()
+        for _ in range(self.BURN_IN):
+            self.sweep()
+
+    def sweep(self):
+        genes = self.genes
+        for name, person in self.people.items():
+            weights = []
+            for g in GENES:
+                if person["mother"] is None:
+                    w = PROBS["gene"][g]
+                else:
+                    w = self.inheritance[
+                        genes[person["mother"]], genes[person["father"]], g
+                    ]
+                if person["trait"] is not None:
+                    w *= PROBS["trait"][g][person["trait"]]
+                for child, other, is_mother in self.children[name]:
+                    if is_mother:
+                        w *= self.inheritance[g, genes[other], genes[child]]
+                    else:
+                        w *= self.inheritance[genes[other], g, genes[child]]
+                weights.append(w)
+            genes[name] = choose(self.rng, weights)
+
+    def __call__(self):
+        self.sweep()
+        return dict(self.genes), 1
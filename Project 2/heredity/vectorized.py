@@ -0,0 +1,159 @@
+import functools
+
+import numpy as np
+
+from heredity import PROBS, probability_transfer
+
+# Number of assignments evaluated together by `enumerate_vectorized`
+BATCH_SIZE = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def probability_tables():
+    """
+    Return the model's probability tables as NumPy arrays, computed once
+    per process:
+        * the probability of each gene count for people without parents,
+        * the probability of each child gene count given the parents'
+          counts, indexed by [mother, father, child],
+        * the probability of not having and of having the trait, indexed
+          by [genes, trait].
+    """
+    gene = np.array([PROBS["gene"][genes] for genes in range(3)])
+
+    transfer = np.array([probability_transfer(genes) for genes in range(3)])
+    m = transfer[:, None]
+    f = transfer[None, :]
+    inheritance = np.stack([
+        (1 - m) * (1 - f),
+        m * (1 - f) + f * (1 - m),
+        m * f
+    ], axis=-1)
+
+    trait = np.array([
+        [PROBS["trait"][genes][False], PROBS["trait"][genes][True]]
+        for genes in range(3)
+    ])
+
+    return gene, inheritance, trait
+
+
+class Model():
+    """
+    Probability tables and family structure of a set of people, as NumPy
+    arrays. Person k is `names[k]`; assignments are integer arrays with
+    one row per assignment and one column per person.
+    """
+
+    def __init__(self, people):
+        self.names = list(people)
+        index = {name: k for k, name in enumerate(self.names)}
+
+        self.gene, self.inheritance, self.trait = probability_tables()
+
+        self.founders = np.array([
+            k for k, name in enumerate(self.names)
+            if people[name]["mother"] is None
+        ], dtype=int)
+        self.children = np.array([
+            k for k, name in enumerate(self.names)
+            if people[name]["mother"] is not None
+        ], dtype=int)
+        self.mothers = np.array([
+            index[people[self.names[k]]["mother"]] for k in self.children
+        ], dtype=int)
+        self.fathers = np.array([
+            index[people[self.names[k]]["father"]] for k in self.children
+        ], dtype=int)
+
+        # Observed traits, and people whose trait is unknown
+        self.observed = np.array([
+            people[name]["trait"] is not None for name in self.names
+        ])
+        self.known = np.array([
+            bool(people[name]["trait"]) for name in self.names
+        ])
+        self.unknown = np.flatnonzero(~self.observed)
+
+    def joint_probabilities(self, genes, traits):
+        """
+        Return the joint probability of each assignment, given as an
+        integer array `genes` of gene counts and a boolean array `traits`.
+        """
+        p = np.empty(genes.shape)
+        p[:, self.founders] = self.gene[genes[:, self.founders]]
+        p[:, self.children] = self.inheritance[
+            genes[:, self.mothers],
+            genes[:, self.fathers],
+            genes[:, self.children]
+        ]
+        p *= self.trait[genes, traits.astype(int)]
+        return p.prod(axis=1)
+
+    def update(self, gene_totals, trait_totals, genes, traits, p):
+        """
+        Add each assignment's joint probability `p` to the running totals:
+        `gene_totals[k, g]` for person k having g genes, and
+        `trait_totals[k, t]` for person k having trait t (0 or 1).
+        """
+        for g in range(3):
+            gene_totals[:, g] += p @ (genes == g)
+        trait_totals[:, 1] += p @ traits
+        trait_totals[:, 0] += p @ ~traits
+
+    def assignments(self, start, stop):
+        """
+        Return the (genes, traits) arrays for assignments `start` to
+        `stop` of an enumeration of every gene assignment combined with
+        every trait assignment consistent with the evidence.
+        """
+        n = len(self.names)
+        codes = np.arange(start, stop)
+        gene_codes, trait_codes = np.divmod(codes, 1 << len(self.unknown))
+
+        genes = gene_codes[:, None] // 3 ** np.arange(n) % 3
+
+        traits = np.tile(self.known, (len(codes), 1))
+        bits = trait_codes[:, None] >> np.arange(len(self.unknown)) & 1
+        traits[:, self.unknown] = bits.astype(bool)
+
+        return genes, traits
+
+    def size(self):
+        """
+        Return the number of assignments consistent with the evidence.
+        """
+        return 3 ** len(self.names) * (1 << len(self.unknown))
+
+
+def enumerate_vectorized(people, batch_size=BATCH_SIZE):
+    """
+    Compute each person's gene and trait distributions by enumerating
+    every assignment consistent with the evidence, `batch_size` at a time.
+
+    Return a dictionary in the format returned by
+    `heredity.enumerate_probabilities`.
+    """
+    model = Model(people)
+    gene_totals = np.zeros((len(model.names), 3))
+    trait_totals = np.zeros((len(model.names), 2))
+
+    for start in range(0, model.size(), batch_size):
+        stop = min(start + batch_size, model.size())
+        genes, traits = model.assignments(start, stop)
+        p = model.joint_probabilities(genes, traits)
+        model.update(gene_totals, trait_totals, genes, traits, p)
+
+    gene_totals /= gene_totals.sum(axis=1, keepdims=True)
+    trait_totals /= trait_totals.sum(axis=1, keepdims=True)
+
+    return {
+        name: {
+            "gene": {g: float(gene_totals[k, g]) for g in (2, 1, 0)},
+            "trait": {
+                True: float(trait_totals[k, 1]),
+                False: float(trait_totals[k, 0])
+            }
+        }
+        for k, name in enumerate(model.names)
+    }
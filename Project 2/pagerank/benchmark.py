@@ -0,0 +1,722 @@
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from cache import LinkStore
+from crawler import (
+    CHUNK_SIZE, crawl_edges, find_links, page_names, to_corpus
+)
+from generate import (
+    page_name, power_law_links, read_edges, write_edges,
+    write_html, write_page
+)
+from incremental import incremental_pagerank
+from outofcore import build_from_file, out_of_core_pagerank
+from pagerank import (
+    DAMPING, crawl, iterate_pagerank, sample_pagerank, transition_model
+)
+from personalized import personalized_pagerank, seed_pagerank, teleport_matrix
+from sampling import parallel_walk
+from solvers import SOLVERS, solve
+from topk import leaders, top_pagerank
+from sparse import Graph, power_iteration, sparse_pagerank
+
+# Corpus sizes for each backend of the iteration benchmark
+DICT_SIZES = [1000, 3000, 10000]
+SPARSE_SIZES = [10000, 100000, 1000000]
+
+# Corpus sizes, and samples drawn at each size, for the sampling benchmark
+SAMPLING_SIZES = [100, 1000, 10000, 100000]
+WALK_SIZES = [1000, 100000, 1000000]
+SAMPLES = 100000
+
+# Corpus sizes for the crawling benchmark, and paragraphs of filler text
+# in each page
+CRAWL_SIZES = [1000, 10000, 50000]
+PARAGRAPHS = 20
+
+# Filler text between links, repeats of it, and pages, for the pages of
+# over CHUNK_SIZE characters stored by the chunking check
+FILLER = "Lorem ipsum dolor sit amet. "
+LARGE_FILLER = 1000
+LARGE_PAGES = 50
+
+# Corpus size, and share of pages changed, for the re-crawling benchmark
+RECRAWL_SIZE = 50000
+CHANGED = 0.01
+
+# Corpus sizes and numbers of pages edited for the incremental benchmark
+INCREMENTAL_SIZES = [100000, 1000000]
+EDITS = [10, 100, 1000]
+
+# Corpus sizes, damping factors and tolerances for the solvers benchmark
+SOLVER_SIZES = [100000, 1000000]
+DAMPINGS = [0.85, 0.95]
+TOLERANCES = [1e-6, 1e-10]
+
+# Corpus sizes, number of seed sets and pages per seed set for the
+# personalized PageRank benchmark
+PERSONALIZED_SIZES = [1000, 10000, 100000]
+SEED_SETS = 128
+SEEDS = 5
+
+# Corpus sizes for the scaling benchmark, and the largest sizes at which
+# pages are written as HTML and crawled, sampled one surfer at a time,
+# and ranked by the dictionary backend
+SCALING_SIZES = [1000, 10000, 100000, 1000000]
+HTML_LIMIT = 100000
+SAMPLING_LIMIT = 100000
+DICT_LIMIT = 10000
+
+# Corpus sizes and memory budgets for the out-of-core benchmark
+OUT_OF_CORE_SIZES = [1000000, 4000000]
+BUDGETS = [16 << 20, 64 << 20, 256 << 20]
+
+# Corpus size and numbers of top pages for the top-k benchmark
+TOP_SIZE = 1000000
+TOPS = [10, 100, 1000]
+
+# Average number of links per page in generated corpora
+LINKS = 8
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [1, 2, 3] or (
+            len(sys.argv) > 1 and sys.argv[1] not in BENCHMARKS):
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [seed]")
+    name = sys.argv[1] if len(sys.argv) > 1 else "iteration"
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 else 0
+
+    BENCHMARKS[name](seed)
+
+
+def benchmark_iteration(seed):
+    """
+    Time the dictionary and sparse backends of the iterative computation
+    on generated corpora of increasing size.
+    """
+    print("iterate_pagerank:")
+    for size in DICT_SIZES:
+        corpus = random_corpus(size, seed=seed)
+        start = time.perf_counter()
+        ranks = iterate_pagerank(corpus, DAMPING)
+        elapsed = time.perf_counter() - start
+
+        stats = dict()
+        sparse_ranks = sparse_pagerank(corpus, DAMPING, stats=stats)
+        error = max(abs(ranks[page] - sparse_ranks[page]) for page in ranks)
+        print(f"  {size} pages: {elapsed:.3f}s, "
+              f"max difference from sparse {error:.2e}")
+
+    print("power_iteration:")
+    for size in SPARSE_SIZES:
+        graph = random_graph(size, seed=seed)
+        stats = dict()
+        start = time.perf_counter()
+        power_iteration(graph, DAMPING, stats=stats)
+        elapsed = time.perf_counter() - start
+        per_iteration = sum(stats["times"]) / stats["iterations"]
+        print(f"  {size} pages: {elapsed:.3f}s, {stats['iterations']} "
+              f"iterations, {per_iteration * 1000:.2f}ms per iteration")
+
+
+def benchmark_sampling(seed):
+    """
+    Measure the samples per second drawn by each sampler as the corpus
+    grows: building the transition model at every step, following
+    precomputed outlinks one surfer at a time, and moving many surfers
+    together with NumPy, in one process and in two.
+    """
+    for size in SAMPLING_SIZES:
+        corpus = random_corpus(size, seed=seed)
+        print(f"{size} pages:")
+
+        # Drawing from the transition model costs O(N) per step, so only
+        # take enough samples to measure it
+        samples = max(SAMPLES // size, 10)
+        start = time.perf_counter()
+        transition_sampling(corpus, DAMPING, samples)
+        report("transition_model", samples, time.perf_counter() - start)
+
+        random.seed(seed)
+        start = time.perf_counter()
+        sample_pagerank(corpus, DAMPING, SAMPLES)
+        report("sample_pagerank", SAMPLES, time.perf_counter() - start)
+
+    for size in WALK_SIZES:
+        graph = random_graph(size, seed=seed)
+        print(f"{size} pages:")
+        for processes in [1, 2]:
+            samples = 10 * SAMPLES
+            start = time.perf_counter()
+            parallel_walk(graph, DAMPING, samples, seed=seed, processes=processes)
+            report(f"walk, {processes} process(es)", samples,
+                   time.perf_counter() - start)
+
+
+def transition_sampling(corpus, damping_factor, n):
+    """
+    Sample `n` pages by drawing each step from `pagerank.transition_model`,
+    as `sample_pagerank` once did.
+    """
+    pages = list(corpus.keys())
+    page = random.choice(pages)
+    for i in range(n):
+        weights = list(transition_model(corpus, page, damping_factor).values())
+        page = random.choices(pages, weights=weights)[0]
+
+
+def report(label, samples, elapsed):
+    print(f"  {label}: {samples / elapsed:,.0f} samples/sec")
+
+
+def benchmark_crawl(seed):
+    """
+    Measure the throughput of `pagerank.crawl` and of the crawler, in one
+    process and in a pool, on generated corpora written to a temporary
+    directory.
+    """
+    for size in CRAWL_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(random_corpus(size, seed=seed), directory)
+            print(f"{size} pages:")
+
+            start = time.perf_counter()
+            crawl(directory)
+            elapsed = time.perf_counter() - start
+            print(f"  crawl: {size / elapsed:,.0f} files/sec")
+
+            for processes in [1, None]:
+                stats = dict()
+                crawl_edges(directory, processes, stats)
+                print(f"  crawl_edges, {processes or os.cpu_count()} "
+                      f"process(es): {stats['files_per_sec']:,.0f} files/sec, "
+                      f"{stats['mb_per_sec']:.1f} MB/sec")
+
+
+def benchmark_chunking(seed):
+    """
+    Check that the link store records the same links, and the same links
+    to missing pages, as `find_links` on the whole text of pages of over
+    CHUNK_SIZE characters, each with a link cut by the end of a chunk.
+    The tokenizer itself is tested on every split in test_crawler.py.
+    """
+    rng = random.Random(seed)
+    names = [page_name(k) for k in range(LARGE_PAGES)]
+    with tempfile.TemporaryDirectory() as directory:
+        links = set()
+        missing = set()
+        sizes = []
+        for name in names:
+            targets = rng.sample(names, LINKS) + [f"missing/{name}"]
+            text = mixed_page(targets, rng, FILLER * LARGE_FILLER)
+
+            # Shift the page so that the end of a chunk cuts the
+            # target of one of its links
+            k = rng.randrange(len(targets))
+            cut = [match.end() for match in re.finditer("href=", text)][k]
+            cut += rng.randint(1, len(targets[k]))
+            text = " " * (-cut % CHUNK_SIZE) + text
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(text)
+            sizes.append(len(text))
+            for target in page_names(name, find_links([text])):
+                if target in names:
+                    links.add((name, target))
+                else:
+                    missing.add((name, target))
+
+        store = LinkStore(directory)
+        store.refresh()
+        stored = {(store.names[source], store.names[target])
+                  for source, target in zip(store.sources.tolist(),
+                                            store.targets.tolist())}
+        stored_missing = {(store.names[source], target)
+                          for source, target in store.missing}
+    print(f"store of {LARGE_PAGES} pages of {min(sizes):,} to "
+          f"{max(sizes):,} characters: "
+          f"{'same' if stored == links else 'different'} links "
+          f"({len(links)}), "
+          f"{'same' if stored_missing == missing else 'different'} missing "
+          f"links ({len(missing)})")
+
+
+def mixed_page(links, rng, filler=FILLER):
+    """
+    Return the text of an HTML page linking to each of `links`, in turn
+    quoted with double quotes, single quotes and not at all, with
+    attributes before and after some of them and filler text between
+    them.
+    """
+    quotes = ['"{}"', "'{}'", "{}"]
+    tags = []
+    for k, link in enumerate(links):
+        href = "href=" + quotes[k % len(quotes)].format(link)
+        before = rng.choice(["", 'class="link" '])
+        after = rng.choice(["", " title=x", "\n"])
+        tags.append(f"<a {before}{href}{after}>{link}</a>")
+    return "<html><body>\n" + "".join(
+        f"<p>{filler * rng.randint(0, 2)}</p>{tag}\n" for tag in tags
+    ) + "</body></html>\n"
+
+
+def benchmark_recrawl(seed):
+    """
+    Compare a full crawl with a refresh of the link store after editing
+    the links of CHANGED of the pages, and after only touching them.
+    """
+    rng = random.Random(seed)
+    corpus = random_corpus(RECRAWL_SIZE, seed=seed)
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(corpus, directory)
+        print(f"{RECRAWL_SIZE} pages:")
+
+        start = time.perf_counter()
+        crawl_edges(directory, 1)
+        print(f"  full crawl: {time.perf_counter() - start:.3f}s")
+
+        stats = dict()
+        LinkStore(directory).refresh(stats=stats)
+        print(f"  building the store: {stats['elapsed']:.3f}s")
+
+        pages = rng.sample(sorted(corpus), int(RECRAWL_SIZE * CHANGED))
+        edited = {page: set(rng.sample(sorted(corpus), LINKS)) - {page}
+                  for page in pages}
+        write_corpus(edited, directory)
+        stats = dict()
+        LinkStore(directory).refresh(stats=stats)
+        print(f"  refresh after editing {len(pages)} pages: "
+              f"{stats['elapsed']:.3f}s ({stats['parsed']} parsed)")
+
+        for page in pages:
+            os.utime(os.path.join(directory, page))
+        stats = dict()
+        LinkStore(directory).refresh(stats=stats)
+        print(f"  refresh after touching {len(pages)} pages: "
+              f"{stats['elapsed']:.3f}s ({stats['hashed']} hashed, "
+              f"{stats['parsed']} parsed)")
+
+        stats = dict()
+        start = time.perf_counter()
+        store = LinkStore(directory)
+        store.refresh(stats=stats)
+        store.graph()
+        print(f"  loading, refreshing and building the graph with no "
+              f"changes: {time.perf_counter() - start:.3f}s")
+
+
+def write_corpus(corpus, directory, paragraphs=PARAGRAPHS):
+    """
+    Write each page of `corpus` to an HTML file in `directory`, with its
+    links spread over `paragraphs` paragraphs of filler text.
+    """
+    for page, links in corpus.items():
+        write_page(directory, page, links, paragraphs)
+
+
+def benchmark_incremental(seed):
+    """
+    Compare a full recompute, power iteration warm-started from the old
+    ranks, and the incremental update after editing the links of a few
+    pages, against a tightly converged result.
+    """
+    rng = np.random.default_rng(seed)
+    for size in INCREMENTAL_SIZES:
+        graph = random_graph(size, seed=seed)
+        ranks = power_iteration(graph, DAMPING, tolerance=1e-12)
+        print(f"{size} pages:")
+
+        for edits in EDITS:
+            pages = rng.choice(size, edits, replace=False)
+            edited = edit_graph(graph, pages, rng)
+            exact = power_iteration(edited, DAMPING, tolerance=1e-12)
+            print(f"  {edits} pages edited:")
+
+            for label, start in [("full", None), ("warm start", ranks)]:
+                stats = dict()
+                begin = time.perf_counter()
+                result = power_iteration(edited, DAMPING, ranks=start, stats=stats)
+                elapsed = time.perf_counter() - begin
+                error = np.abs(result - exact).sum()
+                print(f"    {label}: {elapsed:.3f}s, {stats['iterations']} "
+                      f"iterations, L1 error {error:.1e}")
+
+            for threshold in [1e-2, 1e-4]:
+                begin = time.perf_counter()
+                result, touched = incremental_pagerank(
+                    graph, ranks, edited, DAMPING,
+                    changed=[graph.names[page] for page in pages.tolist()],
+                    threshold=threshold
+                )
+                elapsed = time.perf_counter() - begin
+                error = np.abs(result - exact).sum()
+                print(f"    incremental, threshold {threshold:g}: "
+                      f"{elapsed:.3f}s, {touched} pages touched, "
+                      f"L1 error {error:.1e}")
+
+
+def edit_graph(graph, pages, rng, links=LINKS):
+    """
+    Return a copy of `graph` in which each page of `pages` links to
+    `links` new pages chosen at random.
+    """
+    size = len(graph)
+    outlinks = graph.outlinks()
+    sources = np.repeat(np.arange(size), np.diff(outlinks[0]))
+    targets = outlinks[1]
+    keep = ~np.isin(sources, pages)
+    sources = np.concatenate((sources[keep], np.repeat(pages, links)))
+    targets = np.concatenate(
+        (targets[keep], rng.integers(0, size, len(pages) * links))
+    )
+    keep = sources != targets
+    edges = np.unique(sources[keep] * size + targets[keep])
+    return Graph.from_edges(graph.names, edges // size, edges % size)
+
+
+def benchmark_solvers(seed):
+    """
+    Compare the iterations, sweeps over the links and time each solver
+    takes to reach each tolerance, and its L1 error against a tightly
+    converged power iteration, on the corpora of the project and on
+    generated graphs.
+    """
+    graphs = [
+        (directory, Graph.from_corpus(crawl(directory)))
+        for directory in ["corpus0", "corpus1", "corpus2"]
+    ] + [
+        (f"{size} pages", random_graph(size, seed=seed))
+        for size in SOLVER_SIZES
+    ]
+    for label, graph in graphs:
+        for damping_factor in DAMPINGS:
+            exact = power_iteration(
+                graph, damping_factor, tolerance=1e-14, max_iterations=10000
+            )
+            print(f"{label}, d = {damping_factor}:")
+            for tolerance in TOLERANCES:
+                print(f"  tolerance {tolerance:g}:")
+                for method in SOLVERS:
+                    stats = dict()
+                    start = time.perf_counter()
+                    ranks = solve(graph, damping_factor, method, tolerance,
+                                  stats=stats)
+                    elapsed = time.perf_counter() - start
+                    error = np.abs(ranks - exact).sum()
+                    print(f"    {method}: {stats['iterations']} iterations, "
+                          f"{stats['sweeps']} sweeps, {elapsed:.3f}s, "
+                          f"L1 error {error:.1e}")
+
+
+def benchmark_personalized(seed):
+    """
+    Compare computing personalized PageRank for SEED_SETS seed sets one
+    seed set at a time, building the graph from the corpus for each as a
+    call per seed set does, with computing them together on one graph,
+    in one process and in two.
+    """
+    rng = random.Random(seed)
+    for size in PERSONALIZED_SIZES:
+        corpus = random_corpus(size, seed=seed)
+        names = sorted(corpus)
+        seed_sets = [rng.sample(names, SEEDS) for _ in range(SEED_SETS)]
+        print(f"{size} pages, {SEED_SETS} seed sets:")
+
+        start = time.perf_counter()
+        loop = [seed_pagerank(corpus, [seeds], DAMPING)[0] for seeds in seed_sets]
+        print(f"  per seed set: {time.perf_counter() - start:.3f}s")
+
+        graph = Graph.from_corpus(corpus)
+        teleports = teleport_matrix(graph, seed_sets)
+        exact = np.array([[ranks[name] for ranks in loop] for name in graph.names])
+        for block in [1, None]:
+            for processes in [1, 2]:
+                stats = dict()
+                ranks = personalized_pagerank(
+                    graph, teleports, DAMPING, block=block,
+                    processes=processes, stats=stats
+                )
+                error = np.abs(ranks - exact).max()
+                print(f"  together, {stats['blocks']} blocks, {processes} "
+                      f"process(es): {stats['elapsed']:.3f}s, "
+                      f"max difference {error:.1e}")
+
+
+def benchmark_scaling(seed):
+    """
+    Time each crawl and rank backend on generated power-law corpora of
+    increasing size, with the peak memory it allocates, and the L1 error
+    of its ranks against a tightly converged power iteration.
+    """
+    for size in SCALING_SIZES:
+        sources, targets = map(
+            np.concatenate, zip(*power_law_links(size, seed=seed))
+        )
+        names = [page_name(k) for k in range(size)]
+
+        # Self-links are written to the pages, but left out by crawling
+        keep = sources != targets
+        sources, targets = sources[keep], targets[keep]
+        graph = Graph.from_edges(names, sources, targets)
+        reference = power_iteration(graph, DAMPING, tolerance=1e-12)
+        print(f"{size} pages, {len(sources)} links, "
+              f"{len(graph.dangling)} without links:")
+
+        if size <= HTML_LIMIT:
+            with tempfile.TemporaryDirectory() as directory:
+                write_html(directory, size, power_law_links(size, seed=seed))
+                corpus, elapsed, peak = measure(crawl, directory)
+                found = sum(len(links) for links in corpus.values())
+                print(f"  crawl: {elapsed:.3f}s, peak {peak / 1e6:.1f} MB, "
+                      f"{found} links")
+                edges, elapsed, peak = measure(crawl_edges, directory, 1)
+                print(f"  crawl_edges: {elapsed:.3f}s, peak {peak / 1e6:.1f} "
+                      f"MB, {len(edges[1])} links")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "edges.txt")
+            write_edges(path, power_law_links(size, seed=seed))
+            edges, elapsed, peak = measure(read_edges, path)
+            print(f"  read_edges: {elapsed:.3f}s, peak {peak / 1e6:.1f} MB, "
+                  f"{len(edges[0])} links with self-links")
+
+        backends = [
+            ("power_iteration", lambda: power_iteration(graph, DAMPING)),
+            ("gauss-seidel", lambda: solve(graph, DAMPING, "gauss-seidel")),
+            ("walk", lambda: parallel_walk(graph, DAMPING, 10 * SAMPLES, seed=seed)
+             / (10 * SAMPLES))
+        ]
+        corpus = to_corpus(names, sources, targets)
+        if size <= DICT_LIMIT:
+            backends.append(("iterate_pagerank", lambda: ranks_vector(
+                iterate_pagerank(corpus, DAMPING), names
+            )))
+        if size <= SAMPLING_LIMIT:
+            backends.append(("sample_pagerank", lambda: ranks_vector(
+                sample_pagerank(corpus, DAMPING, SAMPLES), names
+            )))
+        for label, backend in backends:
+            random.seed(seed)
+            ranks, elapsed, peak = measure(backend)
+            error = np.abs(ranks - reference).sum()
+            print(f"  {label}: {elapsed:.3f}s, peak {peak / 1e6:.1f} MB, "
+                  f"L1 error {error:.1e}")
+
+
+def measure(function, *args):
+    """
+    Return (result, elapsed, peak): the result of `function(*args)`, its
+    running time, and the peak memory allocated while running it again
+    under `tracemalloc`, which would slow down the timed run.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def ranks_vector(ranks, names):
+    """
+    Return the values of a dictionary of PageRank values as an array, in
+    the order of `names`.
+    """
+    return np.array([ranks[name] for name in names])
+
+
+def benchmark_outofcore(seed):
+    """
+    Compare power iteration in memory, from an edge file, with building
+    the graph on disk and ranking it out of core under several memory
+    budgets. Each runs in a fresh process, whose peak resident memory
+    above what it held before starting is measured.
+    """
+    context = multiprocessing.get_context("spawn")
+    for size in OUT_OF_CORE_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "edges.txt")
+            links = write_edges(
+                path, power_law_links(size, self_links=0, seed=seed)
+            )
+            print(f"{size} pages, {links} links:")
+
+            runs = [("in memory", in_memory_run, (path, size))] + [
+                (f"out of core, budget {budget >> 20} MB", out_of_core_run,
+                 (path, size, os.path.join(directory, f"graph{k}"), budget))
+                for k, budget in enumerate(BUDGETS)
+            ]
+            reference = None
+            for label, run, args in runs:
+                with context.Pool(1) as pool:
+                    ranks, loading, ranking, iterations, peak = pool.apply(
+                        run, args
+                    )
+                if reference is None:
+                    reference = ranks
+                error = np.abs(ranks - reference).max()
+                print(f"  {label}: loading {loading:.3f}s, ranking "
+                      f"{ranking:.3f}s ({links * iterations / ranking / 1e6:.1f}M "
+                      f"links/sec), peak RSS +{peak / 2 ** 20:.0f} MB, "
+                      f"max difference {error:.1e}")
+
+
+def in_memory_run(path, size):
+    """
+    Load the edge file at `path` into a `Graph` and rank it by power
+    iteration. Return (ranks, loading time, ranking time, iterations,
+    peak resident memory added).
+    """
+    baseline = peak_rss()
+    start = time.perf_counter()
+    sources, targets = read_edges(path)
+    graph = Graph.from_edges(range(size), sources, targets)
+    del sources, targets
+    loading = time.perf_counter() - start
+
+    stats = dict()
+    ranks = power_iteration(graph, DAMPING, stats=stats)
+    ranking = time.perf_counter() - start - loading
+    return ranks, loading, ranking, stats["iterations"], peak_rss() - baseline
+
+
+def out_of_core_run(path, size, directory, budget):
+    """
+    Build the graph of the edge file at `path` in `directory` and rank it
+    out of core within `budget` bytes, returning the same as
+    `in_memory_run`.
+    """
+    baseline = peak_rss()
+    os.mkdir(directory)
+    start = time.perf_counter()
+    build_from_file(directory, size, path, budget)
+    loading = time.perf_counter() - start
+
+    stats = dict()
+    ranks = out_of_core_pagerank(directory, DAMPING, budget=budget, stats=stats)
+    ranking = time.perf_counter() - start - loading
+    peak = peak_rss() - baseline
+    return np.array(ranks), loading, ranking, stats["iterations"], peak
+
+
+def peak_rss():
+    """
+    Return the peak resident memory of this process so far, in bytes.
+    On Linux, it is read from /proc, as the peak from `resource` carries
+    over from the parent of a process.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def benchmark_topk(seed):
+    """
+    Compare the time taken to certify the top pages and their order with
+    the time taken by power iteration to converge, on a generated
+    power-law graph and a random graph, checking the top pages against a
+    tightly converged vector.
+    """
+    sources, targets = map(np.concatenate, zip(
+        *power_law_links(TOP_SIZE, self_links=0, seed=seed)
+    ))
+    graphs = [
+        ("power-law", Graph.from_edges(
+            [page_name(k) for k in range(TOP_SIZE)], sources, targets
+        )),
+        ("random", random_graph(TOP_SIZE, seed=seed))
+    ]
+    for label, graph in graphs:
+        exact = power_iteration(graph, DAMPING, tolerance=1e-13)
+        index = {name: k for k, name in enumerate(graph.names)}
+        stats = dict()
+        start = time.perf_counter()
+        power_iteration(graph, DAMPING, stats=stats)
+        full = time.perf_counter() - start
+        print(f"{TOP_SIZE} pages, {label}: full convergence {full:.3f}s, "
+              f"{stats['iterations']} iterations")
+
+        for k in TOPS:
+            stats = dict()
+            start = time.perf_counter()
+            top, certified = top_pagerank(graph, DAMPING, k, stats=stats)
+            elapsed = time.perf_counter() - start
+            pages = [index[page] for page, _, _ in top]
+            error = max(
+                abs(rank - exact[index[page]]) for page, rank, _ in top
+            )
+            print(f"  top {k}: {elapsed:.3f}s ({1 - elapsed / full:.0%} saved), "
+                  f"{stats['iterations']} iterations, "
+                  f"{'certified' if certified else 'not certified'}, "
+                  f"{'matches' if pages == leaders(exact, k).tolist() else 'differs'}, "
+                  f"bound {top[0][2]:.1e}, largest error {error:.1e}")
+
+
+def random_corpus(size, links=LINKS, seed=0):
+    """
+    Generate a corpus of `size` pages in the format returned by
+    `pagerank.crawl`, each page linking to up to 2 * `links` other pages
+    chosen at random, and about one page in ten linking to none.
+    """
+    rng = random.Random(seed)
+    names = [f"{k}.html" for k in range(size)]
+    corpus = dict()
+    for name in names:
+        count = 0 if rng.random() < 0.1 else rng.randint(1, 2 * links)
+        corpus[name] = set(rng.sample(names, count)) - {name}
+    return corpus
+
+
+def random_graph(size, links=LINKS, seed=0):
+    """
+    Generate a `Graph` with the same shape as `random_corpus`, directly
+    as arrays.
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 2 * links + 1, size)
+    counts[rng.random(size) < 0.1] = 0
+    sources = np.repeat(np.arange(size), counts)
+    targets = rng.integers(0, size, len(sources))
+
+    # Drop self-links and repeated links, as `pagerank.crawl` does
+    keep = sources != targets
+    edges = np.unique(sources[keep] * size + targets[keep])
+    names = [f"{k}.html" for k in range(size)]
+    return Graph.from_edges(names, edges // size, edges % size)
+
+
+BENCHMARKS = {
+    "iteration": benchmark_iteration,
+    "sampling": benchmark_sampling,
+    "crawl": benchmark_crawl,
+    "chunking": benchmark_chunking,
+    "recrawl": benchmark_recrawl,
+    "incremental": benchmark_incremental,
+    "solvers": benchmark_solvers,
+    "personalized": benchmark_personalized,
+    "scaling": benchmark_scaling,
+    "outofcore": benchmark_outofcore,
+    "topk": benchmark_topk
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import codecs
+import hashlib
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from crawler import CHUNK_SIZE, find_links, html_files, page_names
+from sparse import Graph
+
+# Name of the cache file, in the corpus directory
+CACHE_NAME = ".pagerank-cache.npz"
+
+
+class LinkStore():
+    """
+    On-disk store of the link graph of a corpus: the page names, each
+    page's size, modification time and content hash, and the links
+    between pages as arrays of page numbers, kept sorted by target so
+    that they are the rows of the link graph's CSR form: the graph is
+    patched as pages change rather than sorted again. Links to pages
+    missing from the corpus are kept by name, so that they are restored
+    if the page is added later.
+    """
+
+    def __init__(self, directory, path=None):
+        self.directory = directory
+        self.path = path or os.path.join(directory, CACHE_NAME)
+
+        self.names = []
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.mtimes = np.zeros(0, dtype=np.int64)
+        self.hashes = np.zeros((0, 16), dtype=np.uint8)
+        self.sources = np.zeros(0, dtype=np.int64)
+        self.targets = np.zeros(0, dtype=np.int64)
+        self.missing = []
+
+        if os.path.exists(self.path):
+            self.load()
+
+    def load(self):
+        with np.load(self.path) as data:
+            self.names = data["names"].tolist()
+            self.sizes = data["sizes"]
+            self.mtimes = data["mtimes"]
+            self.hashes = data["hashes"]
+            self.sources = data["sources"]
+            self.targets = data["targets"]
+            self.missing = list(zip(
+                data["missing_sources"].tolist(), data["missing_names"].tolist()
+            ))
+
+        # Stores written before links were kept sorted are sorted once
+        if np.any(self.targets[1:] < self.targets[:-1]):
+            order = np.argsort(self.targets, kind="stable")
+            self.sources = self.sources[order]
+            self.targets = self.targets[order]
+
+    def save(self):
+        """
+        Write the store to its file, replacing the previous version only
+        once the new one is complete.
+        """
+        temporary = self.path + ".tmp.npz"
+        np.savez(
+            temporary,
+            names=np.array(self.names, dtype=str),
+            sizes=self.sizes,
+            mtimes=self.mtimes,
+            hashes=self.hashes,
+            sources=self.sources,
+            targets=self.targets,
+            missing_sources=np.array(
+                [source for source, _ in self.missing], dtype=np.int64
+            ),
+            missing_names=np.array(
+                [name for _, name in self.missing], dtype=str
+            )
+        )
+        os.replace(temporary, self.path)
+
+    def refresh(self, processes=1, stats=None):
+        """
+        Bring the store up to date with the corpus directory, parsing only
+        the files added since the last refresh and the files whose size or
+        modification time has changed and whose contents hash differently,
+        across a pool of `processes` worker processes. Removed pages are
+        dropped, and the store is saved.
+
+        If `stats` is a dictionary, record in it the number of "files",
+        and of files "hashed", "parsed", "added" and "removed", and the
+        "elapsed" time.
+        """
+        start = time.perf_counter()
+        index = {name: k for k, name in enumerate(self.names)}
+        files = list(html_files(self.directory))
+        present = {name for name, _, _ in files}
+
+        # Pages whose size or modification time changed, or that are new
+        changed = []
+        for name, size, mtime in files:
+            k = index.get(name)
+            if k is None or self.sizes[k] != size or self.mtimes[k] != mtime:
+                changed.append(name)
+
+        removed = [name for name in self.names if name not in present]
+        added = [name for name in changed if name not in index]
+
+        results = scan(self.directory, changed, processes)
+        parsed = dict()
+        for name, digest, links in results:
+            k = index.get(name)
+            if k is None or self.hashes[k].tobytes() != digest:
+                parsed[name] = (digest, links)
+            else:
+                parsed[name] = None
+
+        if len(changed) > 0 or len(removed) > 0:
+            self.remove(removed)
+            self.add(added)
+
+            index = {name: k for k, name in enumerate(self.names)}
+            attributes = {name: (size, mtime) for name, size, mtime in files}
+            for name, result in parsed.items():
+                k = index[name]
+                self.sizes[k], self.mtimes[k] = attributes[name]
+                if result is not None:
+                    self.hashes[k] = np.frombuffer(result[0], dtype=np.uint8)
+            self.relink(
+                {index[name]: result[1] for name, result in parsed.items()
+                 if result is not None}
+            )
+            self.save()
+
+        if stats is not None:
+            stats.update({
+                "files": len(files),
+                "hashed": len(changed),
+                "parsed": sum(result is not None for result in parsed.values()),
+                "added": len(added),
+                "removed": len(removed),
+                "elapsed": time.perf_counter() - start
+            })
+
+    def remove(self, names):
+        """
+        Drop the pages `names` and renumber the others. Links to a dropped
+        page are kept as missing links.
+        """
+        if len(names) == 0:
+            return
+        index = {name: k for k, name in enumerate(self.names)}
+        keep = np.ones(len(self.names), dtype=bool)
+        keep[[index[name] for name in names]] = False
+        renumber = np.cumsum(keep) - 1
+
+        lost = keep[self.sources] & ~keep[self.targets]
+        self.missing = [
+            (int(renumber[source]), name) for source, name in self.missing
+            if keep[source]
+        ] + [
+            (int(renumber[source]), self.names[target])
+            for source, target in zip(
+                self.sources[lost].tolist(), self.targets[lost].tolist()
+            )
+        ]
+        edges = keep[self.sources] & keep[self.targets]
+        self.sources = renumber[self.sources[edges]]
+        self.targets = renumber[self.targets[edges]]
+
+        self.names = [name for name, k in zip(self.names, keep) if k]
+        self.sizes = self.sizes[keep]
+        self.mtimes = self.mtimes[keep]
+        self.hashes = self.hashes[keep]
+
+    def add(self, names):
+        """
+        Number the new pages `names` after the existing pages, and turn
+        missing links to them into links.
+        """
+        if len(names) == 0:
+            return
+        first = len(self.names)
+        self.names.extend(names)
+        self.sizes = np.concatenate((self.sizes, np.zeros(len(names), np.int64)))
+        self.mtimes = np.concatenate((self.mtimes, np.zeros(len(names), np.int64)))
+        self.hashes = np.concatenate(
+            (self.hashes, np.zeros((len(names), 16), np.uint8))
+        )
+
+        index = {name: first + k for k, name in enumerate(names)}
+        found = [(source, index[name]) for source, name in self.missing
+                 if name in index]
+        self.missing = [(source, name) for source, name in self.missing
+                        if name not in index]
+        self.insert([source for source, _ in found],
+                    [target for _, target in found])
+
+    def relink(self, links):
+        """
+        Replace the links of each page number in `links` with the pages
+        named in `links[page]`.
+        """
+        if len(links) == 0:
+            return
+        replaced = np.zeros(len(self.names), dtype=bool)
+        replaced[list(links)] = True
+        keep = ~replaced[self.sources]
+        self.sources = self.sources[keep]
+        self.targets = self.targets[keep]
+        self.missing = [(source, name) for source, name in self.missing
+                        if not replaced[source]]
+
+        index = {name: k for k, name in enumerate(self.names)}
+        sources = []
+        targets = []
+        for source, names in links.items():
+            for name in names:
+                target = index.get(name)
+                if target is None:
+                    self.missing.append((source, name))
+                else:
+                    sources.append(source)
+                    targets.append(target)
+        self.insert(sources, targets)
+
+    def insert(self, sources, targets):
+        """
+        Add links, each after the stored links into the same page, so that
+        the links stay sorted by target.
+        """
+        sources = np.array(sources, dtype=np.int64)
+        targets = np.array(targets, dtype=np.int64)
+        order = np.argsort(targets, kind="stable")
+        positions = np.searchsorted(self.targets, targets[order], side="right")
+        self.sources = np.insert(self.sources, positions, sources[order])
+        self.targets = np.insert(self.targets, positions, targets[order])
+
+    def graph(self):
+        """
+        Return the `sparse.Graph` of the stored links, whose sources,
+        sorted by target, are already the graph's CSR rows.
+        """
+        counts = np.bincount(self.targets, minlength=len(self.names))
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return Graph(self.names, indptr, self.sources)
+
+
+def scan(directory, names, processes=1):
+    """
+    Return (name, hash, linked page names) for each page of `names`,
+    across a pool of `processes` worker processes (one per CPU if None).
+    """
+    tasks = [(directory, name) for name in names]
+    if processes == 1 or len(tasks) == 0:
+        return [scan_page(task) for task in tasks]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(scan_page, tasks, chunksize=64)
+
+
+def scan_page(task):
+    """
+    Return (name, hash, linked page names) for a (directory, name) pair,
+    reading the file once to hash its bytes and find its links.
+    """
+    directory, name = task
+    digest = hashlib.blake2b(digest_size=16)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def chunks(f):
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+            yield decoder.decode(block)
+        yield decoder.decode(b"", final=True)
+
+    with open(os.path.join(directory, name), "rb") as f:
+        links = find_links(chunks(f))
+    return name, digest.digest(), page_names(name, links)
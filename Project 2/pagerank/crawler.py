@@ -0,0 +1,240 @@
+import argparse
+import functools
+import itertools
+import multiprocessing
+import os
+import posixpath
+import re
+import sys
+import time
+
+import numpy as np
+
+# Characters read from a file at a time
+CHUNK_SIZE = 1 << 16
+
+# Target of a link within its opening tag, quoted with double quotes,
+# single quotes, or not at all, in which case it must be followed by a
+# space or the end of the tag, so that a value cut by the end of a chunk
+# is not taken for the whole value
+LINK = re.compile(
+    r"""<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)(?=[\s>]))""",
+    re.IGNORECASE
+)
+
+# Start of a link's opening tag that runs to the end of the text without
+# being complete: a prefix of a match of LINK, possibly cut inside the
+# quoted target
+PARTIAL_LINK = re.compile(
+    r"""<(?:a(?:\s[^>]*(?:\bhref\s*=\s*(?:"[^"]*|'[^']*))?)?)?\Z""",
+    re.IGNORECASE
+)
+
+# Links with a scheme (http:, mailto:, ...) lead outside of the corpus
+SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+# Page numbers of the corpus being crawled, in each worker process
+index = dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Crawl a directory of HTML pages into an edge list."
+    )
+    parser.add_argument("directory")
+    parser.add_argument(
+        "--names", help="file to write page names to, one per page number"
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    stats = dict()
+    names, sources, targets = crawl_edges(
+        args.directory, args.processes, stats
+    )
+
+    # Write one "source target" line per link
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        sys.stdout.write(f"{source} {target}\n")
+    if args.names is not None:
+        with open(args.names, "w") as f:
+            for name in names:
+                f.write(f"{name}\n")
+
+    print(f"Crawled {stats['files']} files ({stats['bytes'] / 1e6:.1f} MB) "
+          f"in {stats['elapsed']:.3f}s: {stats['files_per_sec']:.1f} files/sec, "
+          f"{stats['mb_per_sec']:.1f} MB/sec", file=sys.stderr)
+
+
+def html_files(directory, prefix=""):
+    """
+    Yield (name, size, modification time in nanoseconds) for every .html
+    file under `directory`, where the name is the file's path relative to
+    `directory`, with "/" separators.
+    """
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            name = prefix + entry.name
+            if entry.is_dir():
+                yield from html_files(entry.path, name + "/")
+            elif entry.name.endswith(".html") and entry.is_file():
+                stat = entry.stat()
+                yield name, stat.st_size, stat.st_mtime_ns
+
+
+def extract_links(path, chunk_size=CHUNK_SIZE):
+    """
+    Return the set of link targets in the file at `path`, exactly as
+    written, reading `chunk_size` characters at a time.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return find_links(iter(lambda: f.read(chunk_size), ""))
+
+
+def find_links(chunks):
+    """
+    Return the set of link targets in the text given as successive
+    `chunks`. A link's tag cut by the end of a chunk is carried over to
+    the next one, from the first tag after the last link found that is
+    still incomplete, so that a "<" inside an attribute is not taken for
+    the start of a tag.
+    """
+    links = set()
+    tail = ""
+    for chunk in itertools.chain(chunks, [""]):
+        text = tail + chunk
+        end = 0
+        for match in LINK.finditer(text):
+            end = match.end()
+            links.add(match.group(match.lastindex))
+        partial = PARTIAL_LINK.search(text, end)
+        tail = text[partial.start():] if partial is not None else ""
+    return links
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def resolve(base, link):
+    """
+    Return the name of the page `link` leads to from a page in directory
+    `base`, relative to the root of the corpus, or None if it leads
+    outside of the corpus. Fragments and queries are dropped, and
+    relative paths are resolved against `base`.
+    """
+    link = link.split("#", 1)[0].split("?", 1)[0].strip()
+    if not link or SCHEME.match(link) or link.startswith("//"):
+        return None
+    if link.startswith("/"):
+        path = link.lstrip("/")
+    else:
+        path = posixpath.join(base, link)
+    path = posixpath.normpath(path)
+    if path.startswith("../") or path == "..":
+        return None
+    return path
+
+
+def initialize(names):
+    """
+    Number the pages `names` in a worker process.
+    """
+    global index
+    index = {name: k for k, name in enumerate(names)}
+
+
+def parse(task):
+    """
+    Return (page number, page numbers linked to) for a (directory, page)
+    pair, leaving out links to the page itself and to pages outside of
+    the corpus.
+    """
+    directory, page = task
+    source = index[page]
+    targets = {
+        index.get(name)
+        for name in page_names(page, extract_links(os.path.join(directory, page)))
+    }
+    targets.discard(None)
+    return source, list(targets)
+
+
+def page_names(page, links):
+    """
+    Return the set of names of the pages the `links` of page `page` lead
+    to, leaving out links to the page itself and links that lead out of
+    the corpus directory.
+    """
+    base = posixpath.dirname(page)
+    names = {resolve(base, link) for link in links}
+    names.discard(None)
+    names.discard(page)
+    return names
+
+
+def crawl_edges(directory, processes=None, stats=None):
+    """
+    Crawl the HTML pages under `directory`, parsing them across a pool of
+    `processes` worker processes (one per CPU if None; none if 1).
+
+    Return (names, sources, targets): the name of each page by page
+    number, and the page numbers of each link's source and target as
+    NumPy arrays. If `stats` is a dictionary, record in it the number of
+    "files" and "bytes" crawled, the "elapsed" time, "files_per_sec" and
+    "mb_per_sec".
+    """
+    start = time.perf_counter()
+    names = []
+    size = 0
+    for name, length, _ in html_files(directory):
+        names.append(name)
+        size += length
+
+    tasks = [(directory, name) for name in names]
+    if processes == 1:
+        initialize(names)
+        results = map(parse, tasks)
+        edges = edge_arrays(results)
+    else:
+        with multiprocessing.Pool(processes, initialize, (names,)) as pool:
+            edges = edge_arrays(pool.imap_unordered(parse, tasks, chunksize=64))
+
+    if stats is not None:
+        elapsed = time.perf_counter() - start
+        stats.update({
+            "files": len(names),
+            "bytes": size,
+            "elapsed": elapsed,
+            "files_per_sec": len(names) / elapsed if elapsed > 0 else float("inf"),
+            "mb_per_sec": size / 1e6 / elapsed if elapsed > 0 else float("inf")
+        })
+
+    return (names,) + edges
+
+
+def edge_arrays(results):
+    """
+    Return (sources, targets) arrays from (source, targets) pairs.
+    """
+    sources = []
+    targets = []
+    for source, links in results:
+        sources.extend([source] * len(links))
+        targets.extend(links)
+    return (
+        np.array(sources, dtype=np.int64),
+        np.array(targets, dtype=np.int64)
+    )
+
+
+def to_corpus(names, sources, targets):
+    """
+    Return the edge list as a corpus in the format returned by
+    `pagerank.crawl`.
+    """
+    corpus = {name: set() for name in names}
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        corpus[names[source]].add(names[target])
+    return corpus
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Exponents of the power laws followed by the number of links out of and
+# into a page, as measured on the web by Broder et al., "Graph structure
+# in the Web"
+OUT_EXPONENT = 2.72
+IN_EXPONENT = 2.1
+
+# Average number of links out of a page with links, and most links out
+# of any page
+LINKS = 8
+MAX_LINKS = 1000
+
+# Share of pages without links, and share of the other pages that also
+# link to themselves
+DANGLING = 0.1
+SELF_LINKS = 0.05
+
+# Pages generated at a time
+CHUNK_PAGES = 1 << 16
+
+# Bytes of an edge file read at a time
+CHUNK_BYTES = 1 << 24
+
+# Paragraphs of filler text in each generated HTML page
+PARAGRAPHS = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a power-law web graph as HTML pages or an edge list."
+    )
+    parser.add_argument("size", type=int, help="number of pages")
+    parser.add_argument("output", help="directory for HTML, file for edges")
+    parser.add_argument("--format", choices=["html", "edges"], default="html")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    links = power_law_links(args.size, seed=args.seed)
+    if args.format == "html":
+        os.makedirs(args.output, exist_ok=True)
+        count = write_html(args.output, args.size, links)
+    else:
+        count = write_edges(args.output, links)
+    print(f"Generated {args.size} pages and {count} links", file=sys.stderr)
+
+
+def power_law_links(size, links=LINKS, dangling=DANGLING,
+                    self_links=SELF_LINKS, seed=0, chunk=CHUNK_PAGES):
+    """
+    Yield (sources, targets) arrays of the links of a generated corpus of
+    `size` pages, `chunk` pages at a time, in order of source page.
+
+    The number of links out of each page follows a power law with
+    exponent OUT_EXPONENT and mean about `links`, and a share `dangling`
+    of the pages has none. Targets are drawn so that links into a page follow a
+    power law with exponent IN_EXPONENT, the most linked-to pages spread
+    at random over the page numbers. A share `self_links` of the pages
+    with links also links to itself. No page links twice to a page.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Minimum of a Pareto distribution with mean `links`
+    minimum = links * (OUT_EXPONENT - 2) / (OUT_EXPONENT - 1)
+
+    # Drawing the page of popularity rank r with probability proportional
+    # to r ** -(1 / (IN_EXPONENT - 1)) gives power-law in-degrees
+    weights = np.arange(1, size + 1) ** (-1 / (IN_EXPONENT - 1))
+    cumulative = np.cumsum(weights)
+    cumulative /= cumulative[-1]
+    popular = rng.permutation(size)
+
+    for low in range(0, size, chunk):
+        high = min(low + chunk, size)
+        pages = np.arange(low, high)
+        counts = np.floor(
+            minimum * (1 - rng.random(len(pages))) ** (-1 / (OUT_EXPONENT - 1))
+        ).astype(np.int64)
+        counts = np.clip(counts, 1, min(MAX_LINKS, size))
+        counts[rng.random(len(pages)) < dangling] = 0
+
+        sources = np.repeat(pages, counts)
+        ranks = np.searchsorted(cumulative, rng.random(len(sources)))
+        targets = popular[np.minimum(ranks, size - 1)]
+
+        own = pages[(counts > 0) & (rng.random(len(pages)) < self_links)]
+        sources = np.concatenate((sources, own))
+        targets = np.concatenate((targets, own))
+
+        # Drop repeated links, sorting by source
+        edges = np.unique(sources * size + targets)
+        yield edges // size, edges % size
+
+
+def page_name(page):
+    """
+    Return the file name of page number `page`.
+    """
+    return f"{page}.html"
+
+
+def write_html(directory, size, links, paragraphs=PARAGRAPHS):
+    """
+    Write pages numbered 0 to `size` - 1 to HTML files in `directory`,
+    with the links yielded by `links` as (sources, targets) arrays sorted
+    by source. Return the number of links written.
+    """
+    count = 0
+    page = 0
+    for sources, targets in links:
+        if len(sources) == 0:
+            continue
+        bounds = np.searchsorted(sources, np.arange(page, sources[-1] + 2))
+        for k, (low, high) in enumerate(zip(bounds[:-1], bounds[1:])):
+            write_page(
+                directory, page_name(page + k),
+                [page_name(target) for target in targets[low:high].tolist()],
+                paragraphs
+            )
+        count += len(sources)
+        page = sources[-1] + 1
+
+    # Pages after the last page with links
+    for page in range(page, size):
+        write_page(directory, page_name(page), [], paragraphs)
+    return count
+
+
+def write_page(directory, page, links, paragraphs=PARAGRAPHS):
+    """
+    Write page `page` to an HTML file in `directory`, with its `links`
+    spread over `paragraphs` paragraphs of filler text.
+    """
+    filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+    links = sorted(links)
+    with open(os.path.join(directory, page), "w") as f:
+        f.write(f"<!DOCTYPE html>\n<html>\n<head><title>{page}</title></head>\n<body>\n")
+        for k in range(paragraphs):
+            f.write(f"<p>{filler}</p>\n")
+            for link in links[k::paragraphs]:
+                f.write(f'<a href="{link}">{link}</a>\n')
+        f.write("</body>\n</html>\n")
+
+
+def write_edges(path, links):
+    """
+    Write the links yielded by `links` as (sources, targets) arrays to
+    the file at `path`, one "source target" line per link, as written by
+    `crawler.py`. Return the number of links written.
+    """
+    count = 0
+    with open(path, "w") as f:
+        for sources, targets in links:
+            np.savetxt(f, np.stack((sources, targets), axis=1), fmt="%d")
+            count += len(sources)
+    return count
+
+
+def read_edges(path):
+    """
+    Return (sources, targets) arrays of the links in an edge file of
+    "source target" lines.
+    """
+    values = np.fromfile(path, dtype=np.int64, sep=" ")
+    return values[0::2], values[1::2]
+
+
+def edge_chunks(path, chunk=CHUNK_BYTES):
+    """
+    Yield (sources, targets) arrays of the links in an edge file of
+    "source target" lines, reading about `chunk` bytes at a time.
+    """
+    tail = b""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            text = tail + block
+            end = text.rfind(b"\n") + 1
+            tail = text[end:]
+            values = np.fromstring(text[:end].decode(), dtype=np.int64, sep=" ")
+            yield values[0::2], values[1::2]
+    values = np.fromstring(tail.decode(), dtype=np.int64, sep=" ")
+    if len(values) > 0:
+        yield values[0::2], values[1::2]
+
+
+if __name__ == "__main__":
+    main()
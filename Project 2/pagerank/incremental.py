@@ -0,0 +1,145 @@
+import numpy as np
+
+# Residual, relative to the average rank 1 / N, below which a page's
+# residual is left in place rather than pushed to the pages it links to
+THRESHOLD = 1e-4
+
+
+def incremental_pagerank(old_graph, old_ranks, graph, damping_factor,
+                         changed=None, threshold=THRESHOLD, stats=None):
+    """
+    Return (ranks, touched): the PageRank vector of `graph` and the number
+    of pages whose rank or residual was updated, starting from the
+    converged vector `old_ranks` of `old_graph`, the same corpus before
+    the links of the pages named in `changed` were edited. If `changed`
+    is None, the pages whose links differ are found by comparing the two
+    graphs. Pages may also have been added or removed.
+
+    Pages without links are left out of the linear system solved here:
+    the ranks of the full model are proportional to its solution, so the
+    result is normalized at the end. In that system the old ranks leave a
+    residual that is the same for every page, except on the pages linked
+    to by changed pages (before or after the edit) and on new pages. Only
+    those residuals are pushed through the links, in rounds that push
+    every residual above `threshold` / N at once, until none is left.
+
+    If `stats` is a dictionary, record in it the number of "rounds" and
+    of "pushes".
+    """
+    n = len(graph)
+    index = {name: k for k, name in enumerate(graph.names)}
+    if old_graph.names == graph.names:
+        old_index = index
+        kept = np.arange(n)
+        renumber = kept
+    else:
+        old_index = {name: k for k, name in enumerate(old_graph.names)}
+        kept = np.array([old_index.get(name, -1) for name in graph.names])
+        renumber = np.array(
+            [index.get(name, -1) for name in old_graph.names], dtype=np.int64
+        )
+    if changed is None:
+        changed = changed_pages(old_graph, graph, renumber)
+
+    # Warm start: the old rank of every page still in the corpus
+    ranks = np.where(kept >= 0, old_ranks[np.maximum(kept, 0)], 0.0)
+
+    # Residual common to every page, from the old ranks and the old and
+    # new numbers of pages
+    dangling = old_ranks[old_graph.dangling].sum()
+    common = (1 - damping_factor) / n - (
+        1 - damping_factor * (1 - dangling)
+    ) / len(old_graph)
+
+    # Pages whose residual differs from the common residual: new pages,
+    # and pages linked to by changed pages before or after the edit
+    new_changed = np.array(
+        [index[name] for name in changed if name in index], dtype=np.int64
+    )
+    old_changed = np.array(
+        [old_index[name] for name in changed if name in old_index],
+        dtype=np.int64
+    )
+    affected = np.zeros(n, dtype=bool)
+    affected[kept < 0] = True
+    affected[graph.targets[np.isin(graph.sources, new_changed)]] = True
+    old_targets = renumber[
+        old_graph.targets[np.isin(old_graph.sources, old_changed)]
+    ]
+    affected[old_targets[old_targets >= 0]] = True
+
+    # Their residuals, from the links into each of them
+    residuals = np.zeros(n)
+    shares = ranks / np.maximum(graph.outdegree, 1)
+    shares[graph.dangling] = 0
+    pages = np.flatnonzero(affected)
+    rows, sources = gather(graph.indptr, graph.sources, pages)
+    incoming = np.bincount(rows, weights=shares[sources], minlength=len(pages))
+    residuals[pages] = (
+        (1 - damping_factor) / n + damping_factor * incoming
+        - ranks[pages] - common
+    )
+
+    # Push residuals above the threshold through the links
+    indptr, targets = graph.outlinks()
+    limit = threshold / n
+    touched = affected
+    rounds = 0
+    pushes = 0
+    active = np.flatnonzero(np.abs(residuals) > limit)
+    while len(active) > 0:
+        rounds += 1
+        pushes += len(active)
+        mass = residuals[active]
+        residuals[active] = 0
+        ranks[active] += mass
+
+        linked = graph.outdegree[active] > 0
+        senders = active[linked]
+        share = damping_factor * mass[linked] / graph.outdegree[senders]
+        rows, receivers = gather(indptr, targets, senders)
+        residuals += np.bincount(receivers, weights=share[rows], minlength=n)
+        touched[receivers] = True
+        active = np.flatnonzero(np.abs(residuals) > limit)
+
+    if stats is not None:
+        stats.update({"rounds": rounds, "pushes": pushes})
+    return ranks / ranks.sum(), int(touched.sum())
+
+
+def gather(indptr, values, rows):
+    """
+    Return (k, values) for the entries of the compressed sparse `rows`,
+    where k is the position in `rows` of each entry's row.
+    """
+    counts = indptr[rows + 1] - indptr[rows]
+    k = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(len(k)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return k, values[indptr[rows][k] + offsets]
+
+
+def changed_pages(old_graph, graph, renumber):
+    """
+    Return the names of the pages of `graph` whose links differ from
+    their links in `old_graph`, given the number in `graph` of each page
+    of `old_graph` (-1 if removed), along with the removed pages.
+    """
+    old_sources = renumber[old_graph.sources]
+    old_targets = renumber[old_graph.targets]
+    n = len(graph)
+
+    # Links as single numbers, with links to or from removed pages left
+    # out and their sources counted as changed
+    kept = (old_sources >= 0) & (old_targets >= 0)
+    old_links = old_sources[kept] * n + old_targets[kept]
+    links = graph.sources * n + graph.targets
+    differ = np.setxor1d(old_links, links)
+
+    changed = set((differ // n).tolist())
+    lost = old_sources[~kept]
+    changed.update(lost[lost >= 0].tolist())
+    names = {graph.names[k] for k in changed}
+    names.update(
+        old_graph.names[k] for k in np.flatnonzero(renumber < 0).tolist()
+    )
+    return names
@@ -0,0 +1,299 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from generate import edge_chunks
+from sparse import MAX_ITERATIONS, TOLERANCE
+
+# Default memory budget, in bytes, for the arrays held while ranking
+BUDGET = 256 << 20
+
+# Bytes held per page of a block of pages (about a dozen float64
+# vectors, counting each one read both in its memory map and as a copy),
+# and per link of a block of links (source and target, mapped and
+# copied, their offsets within their blocks and the rank gathered)
+PAGE_BYTES = 96
+LINK_BYTES = 56
+
+# Bytes held in memory per byte of an edge file read at a time, parsing
+# it into numbers
+TEXT_BYTES = 16
+
+# Files of a graph stored on disk, in its directory
+META = "meta.npz"
+SOURCES = "sources.bin"
+TARGETS = "targets.bin"
+OUTDEGREE = "outdegree.bin"
+RANKS = ["ranks0.bin", "ranks1.bin"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank the pages of an edge list too large for memory."
+    )
+    parser.add_argument("edges", help='file of "source target" lines')
+    parser.add_argument("directory", help="directory to store the graph in")
+    parser.add_argument("--size", type=int, required=True, help="number of pages")
+    parser.add_argument("--budget", type=int, default=BUDGET >> 20, help="MB")
+    parser.add_argument("--damping", type=float, default=0.85)
+    args = parser.parse_args()
+
+    budget = args.budget << 20
+    os.makedirs(args.directory, exist_ok=True)
+    build_from_file(args.directory, args.size, args.edges, budget)
+
+    stats = dict()
+    ranks = out_of_core_pagerank(
+        args.directory, args.damping, budget=budget, stats=stats
+    )
+    print(f"PageRank Results from {stats['iterations']} iterations "
+          f"in {stats['elapsed']:.3f}s")
+    top = np.argsort(ranks)[::-1][:10]
+    for page in top.tolist():
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+class DiskGraph():
+    """
+    Link graph of N pages stored in files of a directory. Pages are split
+    into blocks of `block` pages, and links are stored in cells by the
+    block of their target, then the block of their source: the sources
+    and targets of the links of cell c, from pages of block c % `blocks`
+    to pages of block c // `blocks`, are `sources.bin` and `targets.bin`
+    from `offsets[c]` to `offsets[c + 1]`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with np.load(os.path.join(directory, META)) as meta:
+            self.size = int(meta["size"])
+            self.block = int(meta["block"])
+            self.offsets = meta["offsets"]
+        self.blocks = -(-self.size // self.block)
+
+    def __len__(self):
+        return self.size
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def pages(self, k):
+        """
+        Return the range of page numbers of block `k`.
+        """
+        return k * self.block, min((k + 1) * self.block, self.size)
+
+    def links(self, target, source, chunk):
+        """
+        Yield (sources, targets) arrays of the links from block `source`
+        to block `target`, `chunk` links at a time.
+        """
+        cell = target * self.blocks + source
+        for low in range(self.offsets[cell], self.offsets[cell + 1], chunk):
+            high = min(low + chunk, self.offsets[cell + 1])
+            yield (
+                read(self.path(SOURCES), np.int64, low, high),
+                read(self.path(TARGETS), np.int64, low, high)
+            )
+
+
+def build(directory, size, chunks, budget=BUDGET):
+    """
+    Store the link graph of `size` pages in `directory`, from the
+    (sources, targets) arrays of its links yielded by `chunks()`, which
+    is called twice and should yield chunks of a size that fits in
+    `budget`, holding about `budget` bytes of the graph in memory at a
+    time. Return the `DiskGraph`.
+
+    Links are counted by cell on the first pass, and written to their
+    cell on the second: a counting sort on disk. The size of the blocks
+    of pages is set by `budget` here, and kept when ranking.
+    """
+    block = min(max(budget // 2 // PAGE_BYTES, 1), size)
+    blocks = -(-size // block)
+    cells = blocks * blocks
+
+    counts = np.zeros(cells, dtype=np.int64)
+    for sources, targets in chunks():
+        counts += np.bincount(
+            targets // block * blocks + sources // block, minlength=cells
+        )
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    # Each file is written by cell, sorting each chunk by cell and
+    # appending each cell's links at that cell's next free position
+    position = offsets[:-1].copy()
+    files = {name: open(os.path.join(directory, name), "wb")
+             for name in [SOURCES, TARGETS]}
+    try:
+        for f in files.values():
+            f.truncate(int(offsets[-1]) * 8)
+        for sources, targets in chunks():
+            cell = targets // block * blocks + sources // block
+            order = np.argsort(cell, kind="stable")
+            found = np.bincount(cell, minlength=cells)
+            bounds = np.concatenate(([0], np.cumsum(found)))
+            for c in np.flatnonzero(found).tolist():
+                rows = order[bounds[c]:bounds[c + 1]]
+                for name, values in [(SOURCES, sources), (TARGETS, targets)]:
+                    files[name].seek(int(position[c]) * 8)
+                    files[name].write(values[rows].astype(np.int64).tobytes())
+                position[c] += found[c]
+    finally:
+        for f in files.values():
+            f.close()
+
+    np.savez(
+        os.path.join(directory, META), size=size, block=block, offsets=offsets
+    )
+    graph = DiskGraph(directory)
+
+    # Links out of each page, counted one block of sources at a time
+    chunk = max(budget // 2 // LINK_BYTES, 1)
+    create(graph.path(OUTDEGREE), size)
+    for source in range(blocks):
+        low, high = graph.pages(source)
+        outdegree = np.zeros(high - low)
+        for target in range(blocks):
+            for sources, _ in graph.links(target, source, chunk):
+                outdegree += np.bincount(sources - low, minlength=high - low)
+        write(graph.path(OUTDEGREE), low, outdegree)
+    return graph
+
+
+def build_from_file(directory, size, path, budget=BUDGET):
+    """
+    Store the link graph of `size` pages in the edge file at `path` in
+    `directory`, as `build` does, reading the file in chunks that fit in
+    `budget`.
+    """
+    return build(
+        directory, size,
+        lambda: edge_chunks(path, max(budget // 2 // TEXT_BYTES, 1)), budget
+    )
+
+
+def out_of_core_pagerank(directory, damping_factor, tolerance=TOLERANCE,
+                         max_iterations=MAX_ITERATIONS, budget=BUDGET,
+                         stats=None):
+    """
+    Return the PageRank vector of the `DiskGraph` stored in `directory`
+    by power iteration, as `sparse.power_iteration` computes it, as a
+    read-only memory-mapped array.
+
+    The rank vectors are two files, read from and written to in turn.
+    Each iteration computes the new ranks one block of target pages at a
+    time, streaming the links into the block from each block of sources
+    in chunks, and reading each chunk through its own memory map, so
+    that about `budget` bytes are held in memory at any time.
+
+    If `stats` is a dictionary, record in it the number of "iterations",
+    their "times" and "residuals", and the "elapsed" time.
+    """
+    graph = DiskGraph(directory)
+    n = len(graph)
+    chunk = max(budget // 2 // LINK_BYTES, 1)
+    blocks = graph.blocks
+
+    # Start from 1 / N on every page, and the rank of the pages without
+    # links that it gives
+    old, new = [graph.path(name) for name in RANKS]
+    create(old, n)
+    dangling = 0.0
+    for k in range(blocks):
+        low, high = graph.pages(k)
+        write(old, low, np.full(high - low, 1 / n))
+        outdegree = read(graph.path(OUTDEGREE), np.float64, low, high)
+        dangling += (outdegree == 0).sum() / n
+    create(new, n)
+
+    start = time.perf_counter()
+    times = []
+    residuals = []
+    for _ in range(max_iterations):
+        begin = time.perf_counter()
+        teleport = (1 - damping_factor + damping_factor * dangling) / n
+        residual = 0.0
+        dangling = 0.0
+        for target in range(blocks):
+            low, high = graph.pages(target)
+            incoming = np.zeros(high - low)
+            for source in range(blocks):
+                shares = None
+                first, last = graph.pages(source)
+                for sources, targets in graph.links(target, source, chunk):
+                    if shares is None:
+                        shares = (
+                            read(old, np.float64, first, last)
+                            / np.maximum(read(
+                                graph.path(OUTDEGREE), np.float64, first, last
+                            ), 1)
+                        )
+                    incoming += np.bincount(
+                        targets - low, weights=shares[sources - first],
+                        minlength=high - low
+                    )
+
+            ranks = damping_factor * incoming + teleport
+            residual += np.abs(ranks - read(old, np.float64, low, high)).sum()
+            outdegree = read(graph.path(OUTDEGREE), np.float64, low, high)
+            dangling += ranks[outdegree == 0].sum()
+            write(new, low, ranks)
+
+        old, new = new, old
+        residuals.append(float(residual))
+        times.append(time.perf_counter() - begin)
+        if residual < tolerance:
+            break
+
+    if stats is not None:
+        stats.update({
+            "iterations": len(times),
+            "times": times,
+            "residuals": residuals,
+            "elapsed": time.perf_counter() - start
+        })
+    return np.memmap(old, dtype=np.float64, mode="r", shape=(n,))
+
+
+def create(path, size):
+    """
+    Create a file holding `size` float64 values.
+    """
+    with open(path, "wb") as f:
+        f.truncate(size * 8)
+
+
+def read(path, dtype, low, high):
+    """
+    Return values `low` to `high` of the array of `dtype` in the file at
+    `path`, copied out of a memory map that is closed straight away, so
+    that the pages read do not stay mapped.
+    """
+    if high <= low:
+        return np.zeros(0, dtype=dtype)
+    values = np.memmap(path, dtype=dtype, mode="r", offset=low * 8,
+                       shape=(high - low,))
+    result = np.array(values)
+    del values
+    return result
+
+
+def write(path, low, values):
+    """
+    Write the float64 `values` to the file at `path` from value `low`
+    on, through a memory map that is closed straight away.
+    """
+    if len(values) == 0:
+        return
+    mapped = np.memmap(path, dtype=np.float64, mode="r+", offset=low * 8,
+                       shape=(len(values),))
+    mapped[:] = values
+    mapped.flush()
+    del mapped
+
+
+if __name__ == "__main__":
+    main()
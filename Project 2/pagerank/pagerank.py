@@ -6,16 +6,68 @@ import sys
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Number of pages listed by the top-k mode
+TOP = 10
+
+# Backends available for the iterative computation: dictionaries, power
+# iteration over a sparse matrix, the solvers of `solvers.SOLVERS`, and
+# power iteration until the TOP pages are certain
+METHODS = [
+    "dict", "sparse", "jacobi", "gauss-seidel", "aitken", "quadratic", "top"
+]
+
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+
+    # An optional "--cache PATH" names a link store file to read the link
+    # graph through; without it, the corpus is only read
+    args = sys.argv[1:]
+    cache = None
+    if "--cache" in args and args.index("--cache") + 1 < len(args):
+        position = args.index("--cache")
+        cache = args[position + 1]
+        del args[position:position + 2]
+    if len(args) not in [1, 2] or (len(args) == 2 and args[1] not in METHODS):
+        sys.exit(f"Usage: python pagerank.py corpus [{'|'.join(METHODS)}] "
+                 f"[--cache PATH]")
+    method = args[1] if len(args) == 2 else "dict"
+    if cache is not None:
+
+        # Read the link graph from the link store, parsing only the pages
+        # changed since the last run
+        from cache import LinkStore
+        from crawler import to_corpus
+        store = LinkStore(args[0], cache)
+        store.refresh()
+        corpus = to_corpus(store.names, store.sources, store.targets)
+    elif method != "dict":
+        from crawler import crawl_edges, to_corpus
+        corpus = to_corpus(*crawl_edges(args[0], 1))
+    else:
+        corpus = crawl(args[0])
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    if method == "top":
+        from sparse import Graph
+        from topk import top_pagerank
+        top, certified = top_pagerank(Graph.from_corpus(corpus), DAMPING, TOP)
+        print(f"PageRank Top {len(top)} from Iteration"
+              + ("" if certified else " (order not certain)"))
+        for page, rank, error in top:
+            print(f"  {page}: {rank:.4f} ± {error:.4f}")
+        return
+    if method == "sparse":
+        from sparse import sparse_pagerank
+        ranks = sparse_pagerank(corpus, DAMPING)
+    elif method != "dict":
+        from solvers import solve
+        from sparse import Graph
+        graph = Graph.from_corpus(corpus)
+        ranks = dict(zip(graph.names, solve(graph, DAMPING, method).tolist()))
+    else:
+        ranks = iterate_pagerank(corpus, DAMPING)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
@@ -68,7 +120,7 @@ def transition_model(corpus, page, damping_factor):
     for  k in corpus.keys():
         probability_distribution.update({k: random_page_probability})
 
-    if page_out_length >= 0:
+    if page_out_length > 0:
         for i in corpus[page]:
             probability_distribution[i] = probability_distribution[i] + (damping_factor / page_out_length)
     else:
@@ -88,27 +140,36 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    page_rank = dict()
+    # Number each page, and list the pages each page links to once, so
+    # that each step takes constant time rather than building a
+    # distribution over every page
+    pages = list(corpus.keys())
+    index = {page: k for k, page in enumerate(pages)}
+    outlinks = [[index[link] for link in corpus[page]] for page in pages]
 
-    for i in corpus.keys():
-        page_rank[i] = 0
-
-    random_page = random.choices(list(corpus.keys()))[0]
+    visits = [0] * len(pages)
+    current = random.randrange(len(pages))
 
     for i in range(n):
-        page_rank[random_page] += 1/n
+        visits[current] += 1
 
-        probabilities = transition_model(corpus, random_page, damping_factor).values()
+        # Follow a link with probability `damping_factor`, or jump to any
+        # page, also when the current page has no links
+        links = outlinks[current]
+        if(len(links) > 0 and random.random() < damping_factor):
+            current = links[random.randrange(len(links))]
+        else:
+            current = random.randrange(len(pages))
 
-        random_page = random.choices(list(corpus.keys()), weights = list(probabilities))[0]
+    return {page: visits[k] / n for k, page in enumerate(pages)}
 
-    return page_rank
-    
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, tolerance=0.001,
+                     max_iterations=1000):
     """
     Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    PageRank values until convergence: until no value changes by more
+    than `tolerance`, or after `max_iterations` updates.
 
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
@@ -140,9 +201,14 @@ def iterate_pagerank(corpus, damping_factor):
         for j in copy[i]:
             inverted_corpus[j].add(i)
 
-    while(control_changes):
+    iterations = 0
+    while(control_changes and iterations < max_iterations):
         control_changes = False
+        iterations += 1
 
+        # Compute every new rank from the previous ranks, so that the
+        # ranks still sum to 1 after each update
+        new_page_rank = dict()
         for i in corpus.keys():
             sum = 0
 
@@ -154,10 +220,12 @@ def iterate_pagerank(corpus, damping_factor):
 
             difference = abs(page_rank[i] - prob) 
           
-            if(difference > 0.001):
+            if(difference > tolerance):
                 control_changes = True
                 
-            page_rank[i] = prob
+            new_page_rank[i] = prob
+
+        page_rank = new_page_rank
                 
 
     return page_rank
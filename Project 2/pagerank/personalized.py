@@ -0,0 +1,149 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from sparse import MAX_ITERATIONS, TOLERANCE, Graph
+
+# Rank values held by a block of vectors iterated together: blocks of
+# vectors that fit in the CPU cache are cheaper to update as one array,
+# larger blocks are slower than one vector at a time
+BLOCK_VALUES = 1 << 16
+
+# Link graph of the vectors being computed, in each worker process
+shared = None
+
+
+def personalized_pagerank(graph, teleports, damping_factor,
+                          tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                          block=None, processes=1, stats=None):
+    """
+    Return the personalized PageRank vectors of `graph` for each column of
+    `teleports`, an N x K matrix whose columns are the distributions the
+    random surfer jumps to instead of following a link, as an N x K matrix.
+    Pages without links are treated as linking to every page, as in
+    `pagerank.iterate_pagerank`.
+
+    The columns are split into blocks of `block` columns (as many as fit
+    in BLOCK_VALUES values if None), and each block is solved by power
+    iteration on the whole block at once, each column stopping once the
+    L1 distance between its successive vectors is below `tolerance`. The
+    graph is shared by every block, and blocks are solved across
+    `processes` worker processes (one per CPU if None; none if 1).
+
+    If `stats` is a dictionary, record in it the number of "blocks", the
+    "iterations" run by each block, and the "elapsed" time.
+    """
+    teleports = np.asarray(teleports, dtype=np.float64)
+    if teleports.ndim != 2 or teleports.shape[0] != len(graph):
+        raise ValueError("teleports must have one row per page")
+
+    if block is None:
+        block = max(BLOCK_VALUES // len(graph), 1)
+
+    start = time.perf_counter()
+    tasks = [
+        (teleports[:, k:k + block], damping_factor, tolerance, max_iterations)
+        for k in range(0, teleports.shape[1], block)
+    ]
+    if processes == 1:
+        initialize(graph)
+        results = [iterate_block(*task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes, initialize, (graph,)) as pool:
+            results = pool.starmap(iterate_block, tasks)
+
+    if stats is not None:
+        stats.update({
+            "blocks": len(tasks),
+            "iterations": [iterations for _, iterations in results],
+            "elapsed": time.perf_counter() - start
+        })
+    if len(results) == 0:
+        return np.zeros(teleports.shape)
+    return np.concatenate([ranks for ranks, _ in results], axis=1)
+
+
+def initialize(graph):
+    """
+    Share the link `graph` with the blocks solved in a worker process.
+    """
+    global shared
+    shared = graph
+
+
+def iterate_block(teleports, damping_factor, tolerance, max_iterations):
+    """
+    Return (ranks, iterations) for an N x K block of teleport vectors on
+    the shared graph: the personalized PageRank vectors, and the number
+    of iterations run before every column converged. Converged columns
+    drop out of the iteration.
+
+    The block is held with one row per vector, so that each vector is
+    contiguous: the link matrix is applied to each row with one
+    `np.bincount`, and the rest of each iteration is done on the whole
+    block at once.
+    """
+    graph = shared
+    teleports = np.ascontiguousarray(teleports.T)
+    inverse = 1 / np.maximum(graph.outdegree, 1)
+    ranks = teleports.copy()
+    active = np.arange(len(teleports))
+    iterations = 0
+    while len(active) > 0 and iterations < max_iterations:
+        iterations += 1
+        x = ranks[active]
+        dangling = x[:, graph.dangling].sum(axis=1, keepdims=True)
+        new_x = (
+            damping_factor * multiply(graph, x * inverse)
+            + (1 - damping_factor) * teleports[active]
+            + damping_factor * dangling / len(graph)
+        )
+        residuals = np.abs(new_x - x).sum(axis=1)
+        ranks[active] = new_x
+        active = active[residuals >= tolerance]
+    return ranks.T, iterations
+
+
+def multiply(graph, x):
+    """
+    Return the matrix whose rows are `graph.multiply` of each row of `x`.
+    """
+    result = np.empty(x.shape)
+    for row, values in zip(result, x):
+        row[:] = graph.multiply(values)
+    return result
+
+
+def teleport_matrix(graph, seed_sets):
+    """
+    Return the N x K matrix of teleport vectors for a list of K sets of
+    page names, each jumping with equal probability to the pages of its
+    set.
+    """
+    index = {name: k for k, name in enumerate(graph.names)}
+    teleports = np.zeros((len(graph), len(seed_sets)))
+    for column, seeds in enumerate(seed_sets):
+        pages = [index[name] for name in seeds]
+        if len(pages) == 0:
+            raise ValueError(f"seed set {column} is empty")
+        teleports[pages, column] = 1 / len(pages)
+    return teleports
+
+
+def seed_pagerank(corpus, seed_sets, damping_factor, tolerance=TOLERANCE,
+                  processes=1):
+    """
+    Return, for each set of page names in `seed_sets`, the PageRank
+    values of each page of `corpus` for a random surfer who jumps only
+    to the pages of that set, in the format returned by
+    `pagerank.iterate_pagerank`.
+    """
+    graph = Graph.from_corpus(corpus)
+    ranks = personalized_pagerank(
+        graph, teleport_matrix(graph, seed_sets), damping_factor, tolerance,
+        processes=processes
+    )
+    return [
+        dict(zip(graph.names, column.tolist())) for column in ranks.T
+    ]
@@ -0,0 +1,85 @@
+import multiprocessing
+
+import numpy as np
+
+from sparse import Graph
+
+# Steps each walker takes before its visits start being counted, so that
+# the estimate does not depend on where the walkers start
+BURN_IN = 50
+
+# Number of random surfers walking the graph together
+WALKERS = 1000
+
+
+def walk(graph, damping_factor, samples, walkers=WALKERS, seed=0):
+    """
+    Move `walkers` random surfers over `graph` together, each step taking
+    constant time per walker, until `samples` visits have been counted
+    after the burn-in. Return the number of visits to each page.
+    """
+    rng = np.random.default_rng(seed)
+    indptr, targets = graph.outlinks()
+    outdegree = graph.outdegree
+    n = len(graph)
+
+    pages = rng.integers(0, n, walkers)
+    visited = []
+    counted = 0
+    step = 0
+    while counted < samples:
+        if step >= BURN_IN:
+            visited.append(pages[:samples - counted])
+            counted += len(visited[-1])
+        step += 1
+
+        # Each walker follows one of its page's links with probability
+        # `damping_factor`, and otherwise (or on a page without links)
+        # jumps to any page
+        degree = outdegree[pages]
+        follow = (rng.random(walkers) < damping_factor) & (degree > 0)
+        choice = (rng.random(walkers) * degree).astype(np.int64)
+        jumps = rng.integers(0, n, walkers)
+        jumps[follow] = targets[indptr[pages[follow]] + choice[follow]]
+        pages = jumps
+
+    return np.bincount(np.concatenate(visited), minlength=n)
+
+
+def walk_pagerank(corpus, damping_factor, samples, walkers=WALKERS, seed=0,
+                  processes=1):
+    """
+    Return PageRank values for each page of `corpus` estimated from
+    `samples` visits of random surfers, in the format returned by
+    `pagerank.sample_pagerank`. With several `processes`, the walkers are
+    split between that many worker processes, seeded with `seed`,
+    `seed + 1`, ...
+    """
+    graph = Graph.from_corpus(corpus)
+    visits = parallel_walk(
+        graph, damping_factor, samples, walkers, seed, processes
+    )
+    return {
+        name: float(count) / samples
+        for name, count in zip(graph.names, visits)
+    }
+
+
+def parallel_walk(graph, damping_factor, samples, walkers=WALKERS, seed=0,
+                  processes=1):
+    """
+    Run `walk` across `processes` worker processes, each taking an equal
+    share of the walkers and samples, and return the total visits.
+    """
+    if processes == 1:
+        return walk(graph, damping_factor, samples, walkers, seed)
+
+    shares = [samples // processes] * processes
+    shares[0] += samples - sum(shares)
+    tasks = [
+        (graph, damping_factor, share, max(walkers // processes, 1), seed + k)
+        for k, share in enumerate(shares)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(walk, tasks)
+    return sum(results)
@@ -0,0 +1,169 @@
+import time
+
+import numpy as np
+
+from sparse import MAX_ITERATIONS, TOLERANCE
+
+# Number of blocks of pages updated in turn by Gauss-Seidel
+BLOCKS = 64
+
+# Iterations between extrapolations
+PERIOD = 10
+
+
+def solve(graph, damping_factor, method="jacobi", tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS, stats=None):
+    """
+    Return the PageRank vector of `graph`, computed with `method`, one of
+    SOLVERS, until the L1 distance between successive vectors is below
+    `tolerance`, or `max_iterations` is reached.
+
+    Each solver works on the linear system behind the random surfer,
+    x = (1 - d) / N + d A x + d D x / N, where A spreads each page's rank
+    over its links and D sums the ranks of the pages without links: its
+    solution sums to 1, and a Jacobi sweep is a step of power iteration.
+
+    If `stats` is a dictionary, record in it the number of "iterations"
+    and of "sweeps" over the links (including those spent checking
+    extrapolations), and for each iteration its running time in "times"
+    and the L1 distance from the previous vector in "residuals".
+    """
+    n = len(graph)
+    inverse = np.where(graph.outdegree > 0, 1 / np.maximum(graph.outdegree, 1), 0)
+    sweep, extrapolate = SOLVERS[method]
+
+    x = np.full(n, 1 / n)
+    history = [x]
+    sweeps = 0
+    times = []
+    residuals = []
+    for iteration in range(1, max_iterations + 1):
+        start = time.perf_counter()
+        new_x = sweep(graph, x, inverse, damping_factor)
+        sweeps += 1
+        history = history[-3:] + [new_x]
+
+        # Keep an extrapolation only if it moves less under one more
+        # sweep than the last sweep did: near convergence, differences
+        # are mostly rounding error and extrapolating from them only adds
+        # error
+        if extrapolate is not None and iteration % PERIOD == 0:
+            candidate = rescale(extrapolate(history))
+            if candidate is not None:
+                stepped = sweep(graph, candidate, inverse, damping_factor)
+                sweeps += 1
+                if distance(stepped, candidate) < distance(new_x, x):
+                    new_x = stepped
+                    history = [candidate, stepped]
+
+        residuals.append(distance(new_x, x))
+        x = new_x
+        times.append(time.perf_counter() - start)
+        if residuals[-1] < tolerance:
+            break
+
+    if stats is not None:
+        stats.update({
+            "iterations": len(times),
+            "sweeps": sweeps,
+            "times": times,
+            "residuals": residuals
+        })
+    return x / x.sum()
+
+
+def rescale(x):
+    """
+    Return `x` scaled to sum to 1, as the sweeps expect of the ranks they
+    step from, or None if it has a negative or non-finite value.
+    """
+    if not np.all(np.isfinite(x)) or np.any(x < 0) or x.sum() <= 0:
+        return None
+    return x / x.sum()
+
+
+def distance(x, y):
+    """
+    Return the L1 distance between `x` and `y` once each is scaled to
+    sum to 1.
+    """
+    return float(np.abs(x / x.sum() - y / y.sum()).sum())
+
+
+def jacobi(graph, x, inverse, damping_factor):
+    """
+    Return every page's new rank from the previous ranks.
+    """
+    return graph.step(x, damping_factor)
+
+
+def gauss_seidel(graph, x, inverse, damping_factor):
+    """
+    Return the ranks after updating the pages in BLOCKS blocks in turn,
+    each block from the ranks already updated in earlier blocks, including
+    the rank held by pages without links. Within a block, pages are
+    updated together, so that each block is one NumPy operation: with one
+    page per block, this is Gauss-Seidel proper.
+    """
+    x = x.copy()
+    n = len(graph)
+    dangling = np.zeros(n, dtype=bool)
+    dangling[graph.dangling] = True
+    mass = x[dangling].sum()
+
+    bounds = np.linspace(0, n, min(BLOCKS, n) + 1).astype(int)
+    for low, high in zip(bounds[:-1], bounds[1:]):
+        first, last = graph.indptr[low], graph.indptr[high]
+        sources = graph.sources[first:last]
+        incoming = np.bincount(
+            graph.targets[first:last] - low,
+            weights=x[sources] * inverse[sources],
+            minlength=high - low
+        )
+        ranks = (
+            (1 - damping_factor + damping_factor * mass) / n
+            + damping_factor * incoming
+        )
+        block = dangling[low:high]
+        mass += ranks[block].sum() - x[low:high][block].sum()
+        x[low:high] = ranks
+    return x / x.sum()
+
+
+def aitken(history):
+    """
+    Return Aitken's delta-squared extrapolation, page by page, of the
+    last three vectors of `history`, leaving pages whose second
+    difference is too small unchanged.
+    """
+    x0, x1, x2 = history[-3:]
+    second = x2 - 2 * x1 + x0
+    safe = np.abs(second) > 1e-15
+    x = x2.copy()
+    x[safe] = x2[safe] - (x2[safe] - x1[safe]) ** 2 / second[safe]
+    return x
+
+
+def quadratic(history):
+    """
+    Return the quadratic extrapolation of the last four vectors of
+    `history` (Kamvar et al., "Extrapolation Methods for Accelerating
+    PageRank Computations"), which assumes the iterates are a combination
+    of the solution and the two slowest-decaying eigenvectors.
+    """
+    x0, x1, x2, x3 = history[-4:]
+    y1 = x1 - x0
+    y2 = x2 - x0
+    y3 = x3 - x0
+    gamma, *_ = np.linalg.lstsq(np.stack((y1, y2), axis=1), -y3, rcond=None)
+    g1, g2 = gamma
+    return (g1 + g2 + 1) * x1 + (g2 + 1) * x2 + x3
+
+
+# Sweep and extrapolation (if any) of each method
+SOLVERS = {
+    "jacobi": (jacobi, None),
+    "gauss-seidel": (gauss_seidel, None),
+    "aitken": (jacobi, aitken),
+    "quadratic": (jacobi, quadratic)
+}
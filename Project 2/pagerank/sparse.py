@@ -0,0 +1,144 @@
+import time
+
+import numpy as np
+
+# L1 distance between successive rank vectors below which iteration stops
+TOLERANCE = 1e-8
+
+# Most iterations run before giving up on convergence
+MAX_ITERATIONS = 1000
+
+
+class Graph():
+    """
+    Link graph of a corpus as NumPy arrays. Page k is `names[k]`, and the
+    pages linking to page k are `sources[indptr[k]:indptr[k + 1]]`: the
+    link matrix, transposed, in compressed sparse row (CSR) form.
+    """
+
+    def __init__(self, names, indptr, sources):
+        self.names = list(names)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.sources = np.asarray(sources, dtype=np.int64)
+
+        n = len(self.names)
+        self.targets = np.repeat(np.arange(n), np.diff(self.indptr))
+        self.outdegree = np.bincount(self.sources, minlength=n)
+
+        # Pages without links, treated as linking to every page
+        self.dangling = np.flatnonzero(self.outdegree == 0)
+
+        # Links by source, built by `outlinks` when first needed
+        self.links = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the graph of a corpus in the format returned by
+        `pagerank.crawl`.
+        """
+        names = list(corpus)
+        index = {name: k for k, name in enumerate(names)}
+        sources = []
+        targets = []
+        for name, links in corpus.items():
+            for link in links:
+                sources.append(index[name])
+                targets.append(index[link])
+        return cls.from_edges(names, sources, targets)
+
+    @classmethod
+    def from_edges(cls, names, sources, targets):
+        """
+        Build the graph of the pages `names` from the page numbers of each
+        link's source and target.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        order = np.argsort(targets, kind="stable")
+        counts = np.bincount(targets, minlength=len(names))
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        graph = cls(names, indptr, sources[order])
+
+        # Links listed by source, as crawled, also give the outlinks
+        if np.all(sources[1:] >= sources[:-1]):
+            graph.links = (
+                np.concatenate(([0], np.cumsum(graph.outdegree))), targets
+            )
+        return graph
+
+    def __len__(self):
+        return len(self.names)
+
+    def outlinks(self):
+        """
+        Return the links in compressed sparse row form by source: the
+        pages page k links to are `targets[indptr[k]:indptr[k + 1]]`.
+        """
+        if self.links is None:
+            order = np.argsort(self.sources, kind="stable")
+            indptr = np.concatenate(([0], np.cumsum(self.outdegree)))
+            self.links = (indptr, self.targets[order])
+        return self.links
+
+    def multiply(self, x):
+        """
+        Return the vector whose k-th value is the sum of `x` over the
+        pages linking to page k.
+        """
+        return np.bincount(
+            self.targets, weights=x[self.sources], minlength=len(self)
+        )
+
+    def step(self, ranks, damping_factor):
+        """
+        Return the ranks after one step of the random surfer from `ranks`.
+        """
+        shares = ranks / np.maximum(self.outdegree, 1)
+        teleport = 1 - damping_factor + damping_factor * ranks[self.dangling].sum()
+        return damping_factor * self.multiply(shares) + teleport / len(self)
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, ranks=None, stats=None):
+    """
+    Return the PageRank vector of `graph`, by damped power iteration from
+    `ranks` (1 / N for every page if None) until the L1 distance between
+    successive vectors is below `tolerance`, or `max_iterations` is reached.
+
+    If `stats` is a dictionary, record in it the number of "iterations",
+    and for each iteration its running time in "times" and its L1
+    distance in "residuals".
+    """
+    if ranks is None:
+        ranks = np.full(len(graph), 1 / len(graph))
+
+    times = []
+    residuals = []
+    for _ in range(max_iterations):
+        start = time.perf_counter()
+        new_ranks = graph.step(ranks, damping_factor)
+        residuals.append(float(np.abs(new_ranks - ranks).sum()))
+        ranks = new_ranks
+        times.append(time.perf_counter() - start)
+        if residuals[-1] < tolerance:
+            break
+
+    if stats is not None:
+        stats.update({
+            "iterations": len(times),
+            "times": times,
+            "residuals": residuals
+        })
+    return ranks
+
+
+def sparse_pagerank(corpus, damping_factor, tolerance=TOLERANCE, stats=None):
+    """
+    Return PageRank values for each page of `corpus` by power iteration
+    over its sparse link matrix, in the format returned by
+    `pagerank.iterate_pagerank`.
+    """
+    graph = Graph.from_corpus(corpus)
+    ranks = power_iteration(graph, damping_factor, tolerance, stats=stats)
+    return {name: float(rank) for name, rank in zip(graph.names, ranks)}
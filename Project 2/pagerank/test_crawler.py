@@ -0,0 +1,48 @@
+import pytest
+
+from crawler import extract_links, find_links
+
+# Pages whose links are quoted in each way the crawler reads, or whose
+# tags hold a "<" or a ">" where the tokenizer could mistake them
+PAGES = [
+    '<p>Text</p>\n<a href="double.html">Double</a>\n',
+    "<p>Text</p>\n<a class='x' href='single.html'>Single</a>\n",
+    "<p>Text</p>\n<a href=unquoted.html>Unquoted</a>\n",
+    "<a href=unquoted.html title=x>Unquoted</a>\n",
+    '<a title="a<b" href=unquoted.html>Less than</a>\n',
+    '<a title="<a " href="double.html">Tag in attribute</a>\n',
+    '<A HREF="a>b.html">Greater than</A>\n',
+    '<div><a\nhref="newline.html"\n>Newline</a></div>\n',
+    '<a name="top">No link</a><a href="after.html">After</a>\n',
+    '<p><a href="one.html">1</a> <a href=\'two.html\'>2</a> '
+    '<a href=three.html>3</a></p>\n'
+]
+
+
+@pytest.mark.parametrize("text", PAGES)
+def test_every_split(text):
+    whole = find_links([text])
+    assert len(whole) > 0
+    for k in range(len(text) + 1):
+        assert find_links([text[:k], text[k:]]) == whole, k
+
+
+@pytest.mark.parametrize("text", PAGES)
+def test_one_character_chunks(text):
+    assert find_links(iter(text)) == find_links([text])
+
+
+def test_links_as_written():
+    text = "".join(PAGES)
+    assert find_links([text]) == {
+        "double.html", "single.html", "unquoted.html", "a>b.html",
+        "newline.html", "after.html", "one.html", "two.html", "three.html"
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 16, 64])
+def test_extract_links_chunks(tmp_path, chunk_size):
+    path = tmp_path / "page.html"
+    text = "".join(PAGES)
+    path.write_text(text)
+    assert extract_links(path, chunk_size) == find_links([text])
@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+
+from sparse import MAX_ITERATIONS, TOLERANCE
+
+
+def top_pagerank(graph, damping_factor, k, tolerance=TOLERANCE,
+                 max_iterations=MAX_ITERATIONS, stats=None):
+    """
+    Return (top, certified): the `k` pages of `graph` with the highest
+    PageRank, as a list of (name, rank, error) tuples from highest to
+    lowest, where each page's exact rank is within `error` of `rank`,
+    and whether the pages and their order are certain.
+
+    Power iteration stops as soon as the pages and their order are
+    certain, rather than once the whole vector has converged. After an
+    iteration whose L1 distance from the previous vector is r, the L1
+    distance to the exact vector is at most d r / (1 - d), since each
+    iteration shrinks it by a factor d; as the errors sum to 0, no page's
+    rank is off by more than half of that. The top `k` pages, in order,
+    are certain once each gap between consecutive pages among the top
+    `k` + 1 exceeds twice that error. Pages with equal ranks are never
+    certain, so iteration also stops if the vector converges to within
+    `tolerance`, or after `max_iterations`.
+
+    If `stats` is a dictionary, record in it the number of "iterations",
+    and for each iteration its running time in "times" and its L1
+    distance in "residuals".
+    """
+    n = len(graph)
+    k = min(k, n)
+    ranks = np.full(n, 1 / n)
+
+    times = []
+    residuals = []
+    certified = False
+    for _ in range(max_iterations):
+        start = time.perf_counter()
+        new_ranks = graph.step(ranks, damping_factor)
+        residuals.append(float(np.abs(new_ranks - ranks).sum()))
+        ranks = new_ranks
+        error = damping_factor / (1 - damping_factor) * residuals[-1] / 2
+
+        # The k gaps between the top k + 1 pages add up to at most the
+        # highest rank, so until twice the error is below the highest
+        # rank over k, the smallest gap cannot exceed it
+        if k < 1 or 2 * error * k < ranks.max():
+            top = leaders(ranks, k + 1)
+            gaps = ranks[top[:-1]] - ranks[top[1:]]
+            certified = bool(np.all(gaps > 2 * error))
+        times.append(time.perf_counter() - start)
+        if certified or residuals[-1] < tolerance:
+            break
+
+    if stats is not None:
+        stats.update({
+            "iterations": len(times),
+            "times": times,
+            "residuals": residuals
+        })
+    if not certified:
+        top = leaders(ranks, k)
+    return [
+        (graph.names[page], float(ranks[page]), error)
+        for page in top[:k].tolist()
+    ], certified
+
+
+def leaders(ranks, k):
+    """
+    Return the numbers of the `k` pages with the highest `ranks`, from
+    highest to lowest.
+    """
+    if k >= len(ranks):
+        top = np.arange(len(ranks))
+    else:
+        top = np.argpartition(ranks, len(ranks) - k)[len(ranks) - k:]
+    return top[np.argsort(ranks[top], kind="stable")[::-1]]
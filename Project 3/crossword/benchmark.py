@@ -0,0 +1,234 @@
+import random
+import sys
+import tempfile
+import time
+
+from crossword import Crossword
+from generate import CrosswordCreator
+
+# Structures the benchmarks are run on
+STRUCTURES = ["data/structure0.txt", "data/structure1.txt", "data/structure2.txt"]
+
+# Vocabularies: the largest distribution word list, and generated lists of
+# random words of the same lengths
+WORDS = "data/words2.txt"
+RANDOM_SIZES = [100000]
+
+# Largest vocabulary on which `ac3` is run with the pairwise revise; on
+# larger ones, a single revise is timed
+PAIRWISE_LIMIT = 10000
+
+# Relative frequency of each letter in English text, in percent
+FREQUENCIES = {
+    "A": 8.2, "B": 1.5, "C": 2.8, "D": 4.3, "E": 12.7, "F": 2.2, "G": 2.0,
+    "H": 6.1, "I": 7.0, "J": 0.15, "K": 0.77, "L": 4.0, "M": 2.4, "N": 6.7,
+    "O": 7.5, "P": 1.9, "Q": 0.095, "R": 6.0, "S": 6.3, "T": 9.1, "U": 2.8,
+    "V": 0.98, "W": 2.4, "X": 0.15, "Y": 2.0, "Z": 0.074
+}
+
+
+class PairwiseCreator(CrosswordCreator):
+    """
+    Crossword creator revising arcs by comparing every pair of words, as
+    `CrosswordCreator.revise` once did.
+    """
+
+    def revise(self, x, y):
+        revised = False
+        copy = self.domains[x].copy()
+
+        for word in copy:
+            overlap = self.crossword.overlaps[x, y]
+            must_remove = True
+
+            if(overlap != None):
+                for s in self.domains[y]:
+                    if(word[overlap[0]] == s[overlap[1]]):
+                        must_remove = False
+
+                if(must_remove):
+                    self.domains[x].remove(word)
+                    revised = True
+
+        return revised
+
+
+class ListQueueCreator(CrosswordCreator):
+    """
+    Crossword creator running AC-3 over a list, as `CrosswordCreator.ac3`
+    once did: starting from every pair of variables, taking arcs from the
+    front of the list, and queueing arcs again even when already queued.
+    """
+
+    def ac3(self, arcs=None):
+        if(arcs == None):
+            queue = []
+            for i in self.crossword.overlaps:
+                queue.append(i)
+        else:
+            queue = arcs
+
+        while len(queue) > 0:
+            (x, y) = queue.pop(0)
+            if(self.revise(x, y)):
+                if(len(self.domains[x]) == 0):
+                    return False
+                for z in self.crossword.neighbors(x):
+                    if(x != y):
+                        queue.append((z, x))
+
+        return True
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [1, 2, 3] or (
+            len(sys.argv) > 1 and sys.argv[1] not in BENCHMARKS):
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [seed]")
+    name = sys.argv[1] if len(sys.argv) > 1 else "ac3"
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 else 0
+
+    BENCHMARKS[name](seed)
+
+
+def benchmark_ac3(seed):
+    """
+    Time `ac3` after node consistency with the bitset revise and with the
+    pairwise revise, checking that both prune the domains alike, on each
+    structure with the distribution word list and with larger generated
+    ones.
+    """
+    with open(WORDS) as f:
+        words = f.read().upper().splitlines()
+    vocabularies = [(WORDS, words)] + [
+        (f"{size} random words", random_words(size, words, seed))
+        for size in RANDOM_SIZES
+    ]
+
+    for label, vocabulary in vocabularies:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+            f.write("\n".join(vocabulary))
+            f.flush()
+            for structure in STRUCTURES:
+                print(f"{structure}, {label}:")
+                start = time.perf_counter()
+                creator = CrosswordCreator(Crossword(structure, f.name))
+                print(f"  building the index: {time.perf_counter() - start:.3f}s")
+                elapsed = run_ac3(creator)
+                print(f"  bitset revise: {elapsed:.3f}s")
+
+                pairwise = PairwiseCreator(Crossword(structure, f.name))
+                if len(vocabulary) <= PAIRWISE_LIMIT:
+                    elapsed = run_ac3(pairwise)
+                    same = pairwise.domains == creator.domains
+                    print(f"  pairwise revise: {elapsed:.3f}s, "
+                          f"{'same' if same else 'different'} domains")
+                else:
+                    print(f"  one revise: {time_revise(pairwise):.3f}s "
+                          f"pairwise, {time_revise(creator):.3f}s bitset")
+
+
+def benchmark_propagation(seed):
+    """
+    Count the arcs revised by `ac3` after node consistency, and those
+    whose revision pruned a domain, with the deque worklist and with the
+    list queue, checking that both prune the domains alike, on each
+    structure with the distribution word list and a generated one.
+    """
+    with open(WORDS) as f:
+        words = f.read().upper().splitlines()
+    vocabularies = [(WORDS, words)] + [
+        (f"{size} random words", random_words(size, words, seed))
+        for size in RANDOM_SIZES
+    ]
+
+    for label, vocabulary in vocabularies:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+            f.write("\n".join(vocabulary))
+            f.flush()
+            for structure in STRUCTURES:
+                print(f"{structure}, {label}:")
+                domains = []
+                for name, creator_class in [
+                    ("deque worklist", CrosswordCreator),
+                    ("list queue", ListQueueCreator)
+                ]:
+                    creator = counted(creator_class(Crossword(structure, f.name)))
+                    elapsed = run_ac3(creator)
+                    domains.append(creator.domains)
+                    print(f"  {name}: {elapsed:.3f}s, {creator.calls} arcs "
+                          f"revised, {creator.revised} pruned")
+                print(f"  {'same' if domains[0] == domains[1] else 'different'} "
+                      f"domains")
+
+
+def counted(creator):
+    """
+    Count the calls to `creator.revise` in `creator.calls`, and those
+    that revised a domain in `creator.revised`. Return `creator`.
+    """
+    revise = creator.revise
+    creator.calls = 0
+    creator.revised = 0
+
+    def counting(x, y):
+        creator.calls += 1
+        result = revise(x, y)
+        creator.revised += result
+        return result
+
+    creator.revise = counting
+    return creator
+
+
+def run_ac3(creator):
+    """
+    Enforce node consistency, and return the time `ac3` then takes.
+    """
+    creator.enforce_node_consistency()
+    start = time.perf_counter()
+    creator.ac3()
+    return time.perf_counter() - start
+
+
+def time_revise(creator):
+    """
+    Enforce node consistency, and return the time taken to revise the
+    first arc between overlapping variables, by order of position.
+    """
+    creator.enforce_node_consistency()
+    x, y = min(
+        (arc for arc, overlap in creator.crossword.overlaps.items()
+         if overlap is not None),
+        key=lambda arc: (arc[0].i, arc[0].j, arc[1].i, arc[1].j)
+    )
+    start = time.perf_counter()
+    creator.revise(x, y)
+    return time.perf_counter() - start
+
+
+def random_words(size, words, seed=0):
+    """
+    Return a list of `size` distinct random words, with lengths drawn
+    from those of `words` and letters drawn by their frequency in English.
+    """
+    rng = random.Random(seed)
+    lengths = [len(word) for word in words if len(word) > 1]
+    letters = list(FREQUENCIES)
+    weights = list(FREQUENCIES.values())
+    vocabulary = set()
+    while len(vocabulary) < size:
+        length = rng.choice(lengths)
+        vocabulary.add("".join(rng.choices(letters, weights, k=length)))
+    return sorted(vocabulary)
+
+
+BENCHMARKS = {
+    "ac3": benchmark_ac3,
+    "propagation": benchmark_propagation
+}
+
+
+if __name__ == "__main__":
+    main()
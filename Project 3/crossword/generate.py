@@ -1,4 +1,5 @@
 import sys
+from collections import deque
 
 from crossword import *
 
@@ -14,6 +15,50 @@ class CrosswordCreator():
             var: self.crossword.words.copy()
             for var in self.crossword.variables
         }
+        self.build_index()
+
+    def build_index(self):
+        """
+        Number the words of the vocabulary, and map each (word length,
+        position, letter) to the bitset of the words of that length with
+        that letter at that position. A bitset is an int whose bit k is
+        set if word k is in the set.
+        """
+        self.words = sorted(self.crossword.words)
+        self.ids = {word: k for k, word in enumerate(self.words)}
+        self.size = (len(self.words) + 7) // 8
+
+        members = dict()
+        for k, word in enumerate(self.words):
+            for position, letter in enumerate(word):
+                members.setdefault((len(word), position, letter), []).append(k)
+        self.index = {
+            key: self.bitset(self.words[k] for k in ids)
+            for key, ids in members.items()
+        }
+        self.letters = sorted(set(letter for _, _, letter in self.index))
+
+    def bitset(self, words):
+        """
+        Return the bitset of `words`.
+        """
+        bits = bytearray(self.size)
+        for word in words:
+            k = self.ids[word]
+            bits[k >> 3] |= 1 << (k & 7)
+        return int.from_bytes(bits, "little")
+
+    def members(self, bits):
+        """
+        Return the set of words in the bitset `bits`.
+        """
+        words = set()
+        for offset, byte in enumerate(bits.to_bytes(self.size, "little")):
+            while(byte):
+                low = byte & -byte
+                words.add(self.words[offset * 8 + low.bit_length() - 1])
+                byte ^= low
+        return words
 
     def letter_grid(self, assignment):
         """
@@ -118,23 +163,24 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revised = False
-        copy = self.domains[x].copy()
- 
-        for word in copy:
-            overlap = self.crossword.overlaps[x, y]
-            must_remove = True
-
-            if(overlap != None):
-                for s in self.domains[y]:
-                    if(word[overlap[0]] == s[overlap[1]]):
-                        must_remove = False
-
-                if(must_remove):
-                    self.domains[x].remove(word)
-                    revised = True
+        overlap = self.crossword.overlaps[x, y]
+        if(overlap == None):
+            return False
 
-        return revised
+        # Words of x's length with, at x's side of the overlap, a letter
+        # that some word of y's domain has at y's side. Words of the wrong
+        # length have no support
+        domain_y = self.bitset(self.domains[y])
+        support = 0
+        for letter in self.letters:
+            if(self.index.get((y.length, overlap[1], letter), 0) & domain_y):
+                support |= self.index.get((x.length, overlap[0], letter), 0)
+
+        removed = self.bitset(self.domains[x]) & ~support
+        if(removed == 0):
+            return False
+        self.domains[x] -= self.members(removed)
+        return True
 
 
     def ac3(self, arcs=None):
@@ -148,20 +194,26 @@ class CrosswordCreator():
         """
 
         if(arcs == None):
-            queue = []
-            for i in self.crossword.overlaps:
-                queue.append(i)
-        else:
-            queue = arcs
-
-        while len(queue) > 0:
-            (x, y) = queue.pop(0)
+            arcs = [
+                (x, y)
+                for x in self.crossword.variables
+                for y in self.crossword.neighbors(x)
+            ]
+
+        # Arcs waiting to be revised, each queued at most once
+        queue = deque(dict.fromkeys(arcs))
+        queued = set(queue)
+
+        while(queue):
+            (x, y) = queue.popleft()
+            queued.remove((x, y))
             if(self.revise(x, y)):
                 if(len(self.domains[x]) == 0):
                     return False
                 for z in self.crossword.neighbors(x):
-                    if(x != y):
+                    if(z != y and (z, x) not in queued):
                         queue.append((z, x))
+                        queued.add((z, x))
 
         return True
 